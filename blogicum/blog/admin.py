@@ -1,24 +1,181 @@
-from django.contrib import admin
+from django import forms
+from django.contrib import admin, messages
+from django.contrib.admin.helpers import ActionForm
+from django.core.exceptions import ValidationError
+from django.core.paginator import Paginator
+from django.db import DatabaseError, connection, transaction
+from django.db.models.functions import Substr
+from django.utils.functional import cached_property
+from django.utils.text import Truncator
+from django.utils.timezone import now
 
+from . import const, search, signals
 from .models import Category, Comment, Location, Post
 
+ROW_ESTIMATE_SQL = {
+    'postgresql': 'SELECT reltuples::bigint FROM pg_class WHERE relname = %s',
+    'mysql': (
+        'SELECT table_rows FROM information_schema.tables '
+        'WHERE table_schema = DATABASE() AND table_name = %s'
+    ),
+    # Filled in by ANALYZE; the first number of ``stat`` is the row count
+    # of an index, which for a partial index covers only part of the table.
+    'sqlite': (
+        'SELECT MAX(CAST(stat AS INTEGER)) FROM sqlite_stat1 WHERE tbl = %s'
+    ),
+}
+
+
+def estimated_row_count(model):
+    """Row count from the planner statistics, ``None`` if there are none."""
+    sql = ROW_ESTIMATE_SQL.get(connection.vendor)
+    if sql is None:
+        return None
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(sql, [model._meta.db_table])
+            row = cursor.fetchone()
+    except DatabaseError:
+        return None
+    return row[0] if row and row[0] and row[0] > 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """Unfiltered changelists of big tables skip ``COUNT(*)``."""
+
+    @cached_property
+    def count(self):
+        if not self.object_list.query.where:
+            estimate = estimated_row_count(self.object_list.model)
+            if estimate and estimate > const.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
+
+
+def bulk_update(queryset, **values):
+    """One UPDATE for the whole selection and one invalidation for it."""
+    model = queryset.model
+    with transaction.atomic():
+        pks = list(queryset.values_list('pk', flat=True))
+        tags = signals.affected_tags(model, pks)
+        updated = model.objects.filter(pk__in=pks).update(
+            updated_at=now(), **values
+        )
+        signals.bulk_changed.send(sender=model, pks=pks, tags=tags)
+    return updated
+
+
+class BulkPublishMixin:
+    actions = ('publish', 'unpublish')
+
+    @admin.action(description='Опубликовать выбранные')
+    def publish(self, request, queryset):
+        updated = bulk_update(queryset, is_published=True)
+        self.message_user(request, f'Опубликовано записей: {updated}.')
+
+    @admin.action(description='Снять с публикации выбранные')
+    def unpublish(self, request, queryset):
+        updated = bulk_update(queryset, is_published=False)
+        self.message_user(request, f'Снято с публикации записей: {updated}.')
+
+
+class PostActionForm(ActionForm):
+    category = forms.ModelChoiceField(
+        Category.objects.all(),
+        required=False,
+        label='Категория',
+    )
+
+
+class InputFilter(admin.SimpleListFilter):
+    """Filter by a typed value instead of a list of every possible one.
+
+    Building choices for ``post`` or ``author`` means reading those whole
+    tables on every changelist request.
+    """
+
+    template = 'admin/input_filter.html'
+    lookup = None
+    placeholder = ''
+
+    def lookups(self, request, model_admin):
+        # The filter is only rendered when lookups() is not empty.
+        return (('', ''),)
+
+    def clean(self, value):
+        return value
+
+    def choices(self, changelist):
+        yield {
+            'value': self.value() or '',
+            'query_parts': [
+                (name, value) for name, value in changelist.params.items()
+                if name != self.parameter_name
+            ],
+            'clear_query_string': changelist.get_query_string(
+                remove=[self.parameter_name]
+            ),
+        }
+
+    def queryset(self, request, queryset):
+        value = self.clean((self.value() or '').strip())
+        if not value:
+            return None
+        return queryset.filter(**{self.lookup: value})
+
+
+class PostIdFilter(InputFilter):
+    title = 'публикации'
+    parameter_name = 'post'
+    lookup = 'post_id'
+    placeholder = 'ID публикации'
+
+    def clean(self, value):
+        return value if value.isdigit() else None
+
+
+class AuthorFilter(InputFilter):
+    title = 'автору'
+    parameter_name = 'author'
+    lookup = 'author__username'
+    placeholder = 'Имя пользователя'
+
 
 class CommentAdmin(admin.ModelAdmin):
     list_display = (
-        'text',
+        'short_text',
         'post',
         'created_at',
         'author'
     )
-    readonly_fields = ('created_at',)
-    search_fields = ('text', 'post', 'author',)
-    list_filter = ('text', 'post', 'author')
+    list_select_related = ('post', 'author')
+    readonly_fields = ('created_at', 'updated_at')
+    search_fields = ('text', '=author__username')
+    list_filter = (PostIdFilter, AuthorFilter)
+    autocomplete_fields = ('post', 'author')
+    # Newest first by primary key: no sort over the whole table.
+    ordering = ('-id',)
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).only(
+            'created_at', 'post', 'post__title', 'author', 'author__username'
+        ).annotate(
+            text_preview=Substr('text', 1, const.ADMIN_TEXT_PREVIEW + 1)
+        )
+
+    @admin.display(description='Текст комментария')
+    def short_text(self, comment):
+        return Truncator(comment.text_preview).chars(
+            const.ADMIN_TEXT_PREVIEW
+        )
 
 
-class PostAdmin(admin.ModelAdmin):
+class PostAdmin(BulkPublishMixin, admin.ModelAdmin):
     list_display = (
         'title',
-        'text',
+        'excerpt',
         'pub_date',
         'created_at',
         'author',
@@ -29,13 +186,65 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = (
         'is_published',
     )
-    readonly_fields = ('created_at',)
+    list_select_related = ('author', 'location', 'category')
+    readonly_fields = ('created_at', 'updated_at')
     search_fields = ('title', 'text', 'location__name')
-    list_filter = ('category', 'location')
+    list_filter = ('category', 'location', AuthorFilter)
+    autocomplete_fields = ('author', 'location', 'category')
     empty_value_display = 'Планета земля'
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+    action_form = PostActionForm
+    actions = BulkPublishMixin.actions + ('move_to_category',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).defer('text')
+
+    @admin.action(description='Перенести в выбранную категорию')
+    def move_to_category(self, request, queryset):
+        try:
+            category = self.action_form.base_fields['category'].clean(
+                request.POST.get('category')
+            )
+        except ValidationError:
+            category = None
+        if category is None:
+            self.message_user(
+                request, 'Выберите категорию для переноса.', messages.ERROR
+            )
+            return
+        updated = bulk_update(queryset, category=category)
+        self.message_user(
+            request, f'Перенесено в «{category}» публикаций: {updated}.'
+        )
+
+    def delete_queryset(self, request, queryset):
+        # Used by delete_selected after confirmation: two DELETE statements
+        # instead of a post_delete per comment and per post.
+        with transaction.atomic():
+            pks = list(queryset.values_list('pk', flat=True))
+            tags = signals.affected_tags(Post, pks)
+            comments = Comment.objects.filter(post_id__in=pks)
+            deleted_comments = comments._raw_delete(comments.db)
+            posts = Post.objects.filter(pk__in=pks)
+            posts._raw_delete(posts.db)
+            signals.bulk_changed.send(
+                sender=Post, pks=pks, tags=tags, deleted=True
+            )
+        self.message_user(
+            request, f'Вместе с публикациями удалено комментариев: '
+            f'{deleted_comments}.'
+        )
+
+    def get_search_results(self, request, queryset, search_term):
+        if not search_term or not search.is_available():
+            return super().get_search_results(
+                request, queryset, search_term
+            )
+        return search.filter_posts(queryset, search_term), False
 
 
-class LocationAdmin(admin.ModelAdmin):
+class LocationAdmin(BulkPublishMixin, admin.ModelAdmin):
     list_display = (
         'name',
         'created_at',
@@ -45,10 +254,10 @@ class LocationAdmin(admin.ModelAdmin):
         'is_published',
     )
     search_fields = ('name',)
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'updated_at')
 
 
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(BulkPublishMixin, admin.ModelAdmin):
     list_display = (
         'title',
         'created_at',
@@ -58,7 +267,7 @@ class CategoryAdmin(admin.ModelAdmin):
     )
     search_fields = ('title',)
     list_editable = ('is_published',)
-    readonly_fields = ('created_at',)
+    readonly_fields = ('created_at', 'updated_at')
 
 
 admin.site.register(Post, PostAdmin)
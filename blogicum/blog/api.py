@@ -0,0 +1,317 @@
+from collections import namedtuple
+from functools import wraps
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.http import JsonResponse
+from django.views.decorators.http import require_safe
+
+from . import caching, const, service
+from .models import Category, Comment, Post
+
+# ``columns`` go to only(); ``value`` reads the field off a loaded row.
+ApiField = namedtuple('ApiField', ('columns', 'value'))
+
+
+class ApiError(Exception):
+
+    def __init__(self, message, status=HTTPStatus.BAD_REQUEST):
+        super().__init__(message)
+        self.status = status
+
+
+def _shown(relation, attribute):
+    """``attribute`` of a relation the pages would show, else ``None``."""
+
+    def value(obj):
+        related = getattr(obj, relation)
+        if related is None or not related.is_published:
+            return None
+        return getattr(related, attribute)
+
+    return value
+
+
+def _field(name):
+    return ApiField((name,), lambda obj: getattr(obj, name))
+
+
+def _json(data, status=HTTPStatus.OK):
+    return JsonResponse(data, status=status, json_dumps_params={
+        'separators': (',', ':'), 'ensure_ascii': False
+    })
+
+
+def _parse_ids(raw):
+    try:
+        ids = list(dict.fromkeys(
+            int(value) for value in raw.split(',') if value.strip()
+        ))
+    except ValueError:
+        raise ApiError('Параметр ids — список чисел через запятую.')
+    if len(ids) > const.API_BATCH_LIMIT:
+        raise ApiError(
+            f'Не больше {const.API_BATCH_LIMIT} объектов за один запрос.'
+        )
+    return ids
+
+
+class Resource:
+    """Read-only JSON view of a model: pages, batches and single objects.
+
+    Clients pick ``fields``; only their columns are loaded. Responses
+    are tagged with what they show, so ``anonymous_page_cache`` keeps
+    them just like the HTML pages.
+    """
+
+    model = None
+    # filter() arguments for the rows anyone may read.
+    visible = {}
+    fields = {}
+    default_fields = ()
+    # Always loaded: the ordering and whatever ``tags`` reads.
+    base_columns = ()
+    ordering = ('id',)
+    per_page = const.POSTS_ON_PAGE
+
+    def get_queryset(self, request):
+        """Everything ``request`` may look up by key."""
+        return self.model._default_manager.filter(**self.visible)
+
+    def listing(self, request):
+        """``(queryset, tags)`` of the paginated list."""
+        return self.get_queryset(request), ()
+
+    def tags(self, objects):
+        return ()
+
+    def requested_fields(self, request):
+        raw = request.GET.get(const.API_FIELDS_PARAM)
+        if raw is None:
+            return ('id', *self.default_fields)
+        names = [name.strip() for name in raw.split(',') if name.strip()]
+        unknown = set(names) - self.fields.keys()
+        if unknown:
+            raise ApiError(
+                f'Неизвестные поля: {", ".join(sorted(unknown))}.'
+            )
+        return ('id', *dict.fromkeys(name for name in names if name != 'id'))
+
+    def project(self, queryset, names):
+        columns = set(self.base_columns)
+        for name in names:
+            columns.update(self.fields[name].columns)
+        related = {
+            column.split('__')[0] for column in columns if '__' in column
+        }
+        return queryset.select_related(*related).only(*columns, *related)
+
+    def serialize(self, obj, names):
+        return {name: self.fields[name].value(obj) for name in names}
+
+    def list(self, request):
+        names = self.requested_fields(request)
+        ids = request.GET.get(const.API_IDS_PARAM)
+        if ids is not None:
+            return self.batch(request, _parse_ids(ids), names)
+        queryset, tags = self.listing(request)
+        page = service.KeysetPaginator(
+            self.project(queryset, names), self.per_page, self.ordering
+        ).get_page(request.GET.get(const.CURSOR_PARAM))
+        if tags:
+            caching.tag_request(request, *tags, *self.tags(page))
+        response = _json({
+            'results': [self.serialize(obj, names) for obj in page],
+            'next': page.next_cursor,
+            'previous': page.previous_cursor,
+        })
+        if page.next_cursor:
+            response[const.NEXT_CURSOR_HEADER] = page.next_cursor
+        return response
+
+    def batch(self, request, ids, names):
+        found = self.project(
+            self.get_queryset(request), names
+        ).in_bulk(ids)
+        # Nothing would tell the cache when a missing id shows up.
+        if len(found) == len(ids):
+            caching.tag_request(request, *self.tags(found.values()))
+        return _json({
+            'results': [
+                self.serialize(found[pk], names) for pk in ids if pk in found
+            ],
+        })
+
+    def detail(self, request, **lookup):
+        names = self.requested_fields(request)
+        obj = self.project(
+            self.get_queryset(request), names
+        ).filter(**lookup).first()
+        if obj is None:
+            raise ApiError('Не найдено.', HTTPStatus.NOT_FOUND)
+        caching.tag_request(request, *self.tags([obj]))
+        return _json(self.serialize(obj, names))
+
+
+class PostResource(Resource):
+    model = Post
+    fields = {
+        'id': ApiField((), lambda post: post.pk),
+        'title': _field('title'),
+        'text': _field('text'),
+        'excerpt': _field('excerpt'),
+        'pub_date': _field('pub_date'),
+        'updated_at': _field('updated_at'),
+        'comment_count': _field('comment_count'),
+        'image': ApiField(
+            ('image',), lambda post: post.image.url if post.image else None
+        ),
+        'author': ApiField(
+            ('author__username',), lambda post: post.author.username
+        ),
+        'category': ApiField(
+            ('category__slug', 'category__is_published'),
+            _shown('category', 'slug')
+        ),
+        'location': ApiField(
+            ('location__name', 'location__is_published'),
+            _shown('location', 'name')
+        ),
+    }
+    default_fields = (
+        'title', 'excerpt', 'pub_date', 'comment_count', 'image',
+        'author', 'category', 'location',
+    )
+    base_columns = ('pub_date', 'author', 'category', 'location')
+    ordering = ('-pub_date', '-id')
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).visible_to(request.user)
+
+    def listing(self, request):
+        """The index, or a category or profile feed, by query parameters."""
+        posts, tags = Post.objects.all(), set()
+        own = False
+        slug = request.GET.get('category')
+        if slug is not None:
+            category = Category.objects.filter(
+                slug=slug, is_published=True
+            ).only('pk').first()
+            if category is None:
+                raise ApiError('Категория не найдена.', HTTPStatus.NOT_FOUND)
+            posts = posts.filter(category=category)
+            tags |= {
+                caching.instance_tag(category),
+                caching.category_feed_tag(category.pk),
+            }
+        username = request.GET.get('author')
+        if username is not None:
+            author = get_user_model().objects.filter(
+                username=username
+            ).only('pk').first()
+            if author is None:
+                raise ApiError('Автор не найден.', HTTPStatus.NOT_FOUND)
+            posts = posts.filter(author=author)
+            own = request.user == author
+            tags |= {
+                caching.instance_tag(author),
+                caching.author_feed_tag(author.pk),
+            }
+        if not own:
+            posts = posts.published()
+        return posts, tags or {caching.FEED_TAG}
+
+    def tags(self, posts):
+        return caching.post_tags(posts)
+
+
+class CommentResource(Resource):
+    model = Comment
+    fields = {
+        'id': ApiField((), lambda comment: comment.pk),
+        'text': _field('text'),
+        'created_at': _field('created_at'),
+        'post': ApiField((), lambda comment: comment.post_id),
+        'author': ApiField(
+            ('author__username',), lambda comment: comment.author.username
+        ),
+    }
+    default_fields = ('text', 'created_at', 'post', 'author')
+    base_columns = ('created_at', 'post', 'author')
+    ordering = ('created_at', 'id')
+    per_page = const.COMMENTS_ON_PAGE
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).filter(
+            post__in=Post.objects.visible_to(request.user).values('pk')
+        )
+
+    def listing(self, request):
+        """The thread of the ``post`` parameter, oldest first."""
+        post_id = request.GET.get('post', '')
+        if not post_id.isdigit():
+            raise ApiError('Укажите публикацию в параметре post или ids.')
+        post = Post.objects.visible_to(request.user).filter(
+            pk=post_id
+        ).only('pk').first()
+        if post is None:
+            raise ApiError('Публикация не найдена.', HTTPStatus.NOT_FOUND)
+        return post.comments.all(), {caching.post_tag(post.pk)}
+
+    def tags(self, comments):
+        tags = set()
+        for comment in comments:
+            tags.add(caching.post_tag(comment.post_id))
+            tags.add(caching.user_tag(comment.author_id))
+        return tags
+
+
+class CategoryResource(Resource):
+    model = Category
+    visible = {'is_published': True}
+    fields = {
+        'id': ApiField((), lambda category: category.pk),
+        'title': _field('title'),
+        'description': _field('description'),
+        'slug': _field('slug'),
+    }
+    default_fields = ('title', 'description', 'slug')
+
+    def tags(self, categories):
+        return {caching.instance_tag(category) for category in categories}
+
+
+class ProfileResource(Resource):
+    model = get_user_model()
+    fields = {
+        'id': ApiField((), lambda user: user.pk),
+        'username': _field('username'),
+        'first_name': _field('first_name'),
+        'last_name': _field('last_name'),
+    }
+    default_fields = ('username', 'first_name', 'last_name')
+
+    def tags(self, users):
+        return {caching.instance_tag(user) for user in users}
+
+
+def _api_view(method):
+
+    @wraps(method)
+    def view(request, *args, **kwargs):
+        try:
+            return method(request, *args, **kwargs)
+        except ApiError as error:
+            return _json({'error': str(error)}, status=error.status)
+
+    return require_safe(caching.anonymous_page_cache(view))
+
+
+posts = _api_view(PostResource().list)
+post = _api_view(PostResource().detail)
+comments = _api_view(CommentResource().list)
+comment = _api_view(CommentResource().detail)
+categories = _api_view(CategoryResource().list)
+category = _api_view(CategoryResource().detail)
+profiles = _api_view(ProfileResource().list)
+profile = _api_view(ProfileResource().detail)
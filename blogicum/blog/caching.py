@@ -0,0 +1,320 @@
+import hashlib
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.cache import patch_vary_headers
+from django.utils.safestring import mark_safe
+from django.utils.translation import get_language
+
+from . import const
+
+TAG_KEY = 'blog:tag:{}'
+PAGE_KEY = 'blog:page:{}'
+CARD_KEY = 'blog:card:{}'
+CARD_STATS_KEY = 'blog:card-stats:{}'
+RELEASE_KEY = 'blog:next-release'
+FEED_TAG = 'feed'
+
+
+def get_cache():
+    return caches[getattr(settings, 'BLOG_CACHE_ALIAS', 'default')]
+
+
+def model_tag(model, pk):
+    return f'{model._meta.label_lower}:{pk}'
+
+
+def instance_tag(obj):
+    return model_tag(obj, obj.pk)
+
+
+def post_tag(post_id):
+    return f'blog.post:{post_id}'
+
+
+def user_tag(user_id):
+    return f'{settings.AUTH_USER_MODEL.lower()}:{user_id}'
+
+
+def category_feed_tag(category_id):
+    return f'{FEED_TAG}:category:{category_id}'
+
+
+def author_feed_tag(author_id):
+    return f'{FEED_TAG}:author:{author_id}'
+
+
+def post_tags(posts):
+    """Tags of everything a rendered post card or detail page shows."""
+    tags = set()
+    for post in posts:
+        tags.add(post_tag(post.pk))
+        tags.add(user_tag(post.author_id))
+        if post.category_id:
+            tags.add(f'blog.category:{post.category_id}')
+        if post.location_id:
+            tags.add(f'blog.location:{post.location_id}')
+    return tags
+
+
+def listing_tags(category_id, author_id):
+    """Tags of the feeds a post with these keys is listed in."""
+    tags = {FEED_TAG, author_feed_tag(author_id)}
+    if category_id:
+        tags.add(category_feed_tag(category_id))
+    return tags
+
+
+def tag_request(request, *tags):
+    """Record tags on a request served through ``anonymous_page_cache``."""
+    if hasattr(request, 'cache_tags'):
+        request.cache_tags.update(tags)
+
+
+def _new_version():
+    return time.time_ns()
+
+
+def _bump(tags):
+    get_cache().set_many(
+        {TAG_KEY.format(tag): _new_version() for tag in tags}, None
+    )
+
+
+def invalidate(*tags):
+    if not tags:
+        return
+    _bump(tags)
+    # A reader may re-cache the old rows before our transaction commits;
+    # bump once more when it does.
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: _bump(tags))
+
+
+def tag_versions(tags, since=None):
+    """Current versions of ``tags``; tags never seen before get one now.
+
+    With ``since``, returns ``None`` if one of the existing tags was
+    invalidated after that moment.
+    """
+    cache = get_cache()
+    keys = {TAG_KEY.format(tag): tag for tag in tags}
+    versions = cache.get_many(keys)
+    if since is not None and any(
+        version > since for version in versions.values()
+    ):
+        return None
+    for key in keys.keys() - versions.keys():
+        cache.add(key, _new_version(), None)
+        versions[key] = cache.get(key)
+    return {keys[key]: version for key, version in versions.items()}
+
+
+def _published_now():
+    # Imported here: models imports images, which imports this module.
+    from .models import published_now
+    return published_now()
+
+
+def _released(moment):
+    return moment is not None and _published_now() > moment
+
+
+def _is_fresh(entry):
+    # Nothing is written when a scheduled post goes live, so no tag tells.
+    if _released(entry['release']):
+        return False
+    keys = [TAG_KEY.format(tag) for tag in entry['tags']]
+    current = get_cache().get_many(keys)
+    return all(
+        current.get(TAG_KEY.format(tag)) == version
+        for tag, version in entry['tags'].items()
+    )
+
+
+def _lists_posts(tags):
+    return any(
+        tag == FEED_TAG or tag.startswith(f'{FEED_TAG}:') for tag in tags
+    )
+
+
+def next_release(at):
+    """Earliest pub_date ``published(at)`` hides, cached until it passes.
+
+    Every write that schedules, moves or drops a post bumps ``FEED_TAG``,
+    so one query serves all pages until then.
+    """
+    from .models import Post
+
+    cache = get_cache()
+    entry = cache.get(RELEASE_KEY)
+    if entry is not None and entry['at'] <= at and _is_fresh(entry):
+        return entry['release']
+    started = _new_version()
+    release = Post.objects.next_release(at)
+    versions = tag_versions((FEED_TAG,), since=started)
+    if versions is not None:
+        cache.set(RELEASE_KEY, {
+            'at': at, 'tags': versions, 'release': release
+        }, None)
+    return release
+
+
+def _page_key(request):
+    # conditional.respond sets page_version to the ETag it is about to send.
+    version = getattr(request, 'page_version', '')
+    return PAGE_KEY.format(hashlib.md5(
+        f'{request.get_full_path()}:{version}'.encode()
+    ).hexdigest())
+
+
+def _serve_cached(view, request, args, kwargs):
+    cache = get_cache()
+    key = _page_key(request)
+    entry = cache.get(key)
+    if entry is not None and _is_fresh(entry):
+        response = HttpResponse(entry['content'])
+        for header, value in entry['headers'].items():
+            response[header] = value
+        response[const.PAGE_CACHE_HEADER] = 'hit'
+        return response
+    started = _new_version()
+    # Before the view runs: a post released meanwhile only makes the
+    # entry expire early.
+    at = _published_now()
+    request.cache_tags = set()
+    response = view(request, *args, **kwargs)
+    if (response.status_code == 200
+            and not response.streaming
+            and not request.META.get('CSRF_COOKIE_USED')
+            and request.cache_tags):
+        if hasattr(response, 'render'):
+            response.render()
+        versions = tag_versions(request.cache_tags, since=started)
+        if versions is not None:
+            cache.set(key, {
+                'tags': versions,
+                # Lists change when a scheduled post goes live.
+                'release': (
+                    next_release(at)
+                    if _lists_posts(request.cache_tags) else None
+                ),
+                'content': response.content,
+                'headers': dict(response.items()),
+            }, getattr(
+                settings,
+                'BLOG_PAGE_CACHE_TIMEOUT',
+                const.PAGE_CACHE_TIMEOUT
+            ))
+        response[const.PAGE_CACHE_HEADER] = 'miss'
+    return response
+
+
+def anonymous_page_cache(view):
+    """Serve ``view`` to anonymous readers from the cache.
+
+    The view lists what the page shows through ``tag_request``; the page
+    stays valid until one of those tags is invalidated, the next scheduled
+    post goes live or ``BLOG_PAGE_CACHE_TIMEOUT`` runs out. Invalidation
+    only reaches other processes through a shared cache backend.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or request.user.is_authenticated):
+            return view(request, *args, **kwargs)
+        response = _serve_cached(view, request, args, kwargs)
+        patch_vary_headers(response, ('Cookie',))
+        return response
+
+    return wrapper
+
+
+def public_page_cache(view):
+    """Cache ``view`` for everyone; it must not depend on the viewer.
+
+    Unlike ``anonymous_page_cache`` this never touches ``request.user``,
+    so a hit costs no session or user lookup.
+    """
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if request.method not in ('GET', 'HEAD'):
+            return view(request, *args, **kwargs)
+        return _serve_cached(view, request, args, kwargs)
+
+    return wrapper
+
+
+def _card_key(post, versions):
+    category, location = post.category, post.location
+    return CARD_KEY.format(':'.join(str(part) for part in (
+        post.pk,
+        versions[post_tag(post.pk)],
+        versions[user_tag(post.author_id)],
+        versions[instance_tag(category)] if category else '-',
+        versions[instance_tag(location)] if location else '-',
+        int(bool(category and category.is_published)),
+        int(bool(location and location.is_published)),
+        post.comment_count,
+        get_language(),
+    )))
+
+
+def _count_card_lookups(hits, misses):
+    cache = get_cache()
+    for name, delta in (('hits', hits), ('misses', misses)):
+        if delta:
+            key = CARD_STATS_KEY.format(name)
+            cache.add(key, 0, None)
+            cache.incr(key, delta)
+
+
+def card_cache_stats():
+    values = get_cache().get_many(
+        [CARD_STATS_KEY.format(name) for name in ('hits', 'misses')]
+    )
+    return {
+        name: values.get(CARD_STATS_KEY.format(name), 0)
+        for name in ('hits', 'misses')
+    }
+
+
+def reset_card_cache_stats():
+    get_cache().delete_many(
+        [CARD_STATS_KEY.format(name) for name in ('hits', 'misses')]
+    )
+
+
+def render_post_cards(posts):
+    """Rendered ``includes/post_card.html`` for each post, cached per card.
+
+    The key holds the tag versions of the post, its author, category and
+    location, so any change that purges pages showing the card also
+    retires the card; two cache round trips serve the whole page.
+    """
+    posts = list(posts)
+    if not posts:
+        return []
+    cache = get_cache()
+    versions = tag_versions(post_tags(posts))
+    keys = [_card_key(post, versions) for post in posts]
+    cards = cache.get_many(keys)
+    hits = len(cards)
+    rendered = {
+        key: render_to_string('includes/post_card.html', {'post': post})
+        for key, post in zip(keys, posts) if key not in cards
+    }
+    if rendered:
+        cache.set_many(rendered, getattr(
+            settings, 'BLOG_CARD_CACHE_TIMEOUT', const.CARD_CACHE_TIMEOUT
+        ))
+        cards.update(rendered)
+    _count_card_lookups(hits, len(rendered))
+    return [mark_safe(cards[key]) for key in keys]
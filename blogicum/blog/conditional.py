@@ -0,0 +1,171 @@
+import hashlib
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.contrib.auth import get_user_model
+from django.db.models import Max
+from django.utils.cache import (
+    get_conditional_response, patch_cache_control, patch_vary_headers
+)
+from django.utils.http import http_date, quote_etag
+from django.utils.translation import get_language
+
+from . import caching
+from .models import Category, Location, Post
+
+
+def _max_updated_at(queryset):
+    return queryset.aggregate(latest=Max('updated_at'))['latest']
+
+
+def _latest_pub_date(posts):
+    # Scheduled posts show up when their pub_date passes; nothing is
+    # written at that moment, so the newest visible pub_date stands in.
+    return posts.order_by('-pub_date').values_list(
+        'pub_date', flat=True
+    ).first()
+
+
+def _invalidated_at(*tags):
+    """When ``tags`` were last invalidated; covers deleted rows too."""
+    versions = caching.tag_versions(tags).values()
+    return datetime.fromtimestamp(max(versions) / 1e9, tz=timezone.utc)
+
+
+def _newest(*moments):
+    return max(moment for moment in moments if moment is not None)
+
+
+def _relations_changed_at():
+    return (
+        _max_updated_at(Category.objects.all()),
+        _max_updated_at(Location.objects.all()),
+    )
+
+
+def index_changed_at(request):
+    return _newest(
+        _max_updated_at(Post.objects.all()),
+        _latest_pub_date(Post.objects.published()),
+        *_relations_changed_at(),
+        _invalidated_at(caching.FEED_TAG),
+    )
+
+
+def category_changed_at(request, category_slug):
+    category = Category.objects.filter(
+        slug=category_slug, is_published=True
+    ).values_list('pk', 'updated_at').first()
+    if category is None:
+        return None
+    category_id, updated_at = category
+    return _newest(
+        updated_at,
+        _max_updated_at(Post.objects.filter(category_id=category_id)),
+        _latest_pub_date(
+            Post.objects.published().filter(category_id=category_id)
+        ),
+        _max_updated_at(Location.objects.all()),
+        _invalidated_at(
+            caching.model_tag(Category, category_id),
+            caching.category_feed_tag(category_id),
+        ),
+    )
+
+
+def profile_changed_at(request, username):
+    author_id = get_user_model().objects.filter(
+        username=username
+    ).values_list('pk', flat=True).first()
+    if author_id is None:
+        return None
+    return _newest(
+        _max_updated_at(Post.objects.filter(author_id=author_id)),
+        _latest_pub_date(Post.objects.published().filter(
+            author_id=author_id
+        )),
+        *_relations_changed_at(),
+        _invalidated_at(
+            caching.user_tag(author_id),
+            caching.author_feed_tag(author_id),
+        ),
+    )
+
+
+def post_changed_at(post):
+    """Validator moment of a post loaded with ``for_detail()``."""
+    return _newest(
+        post.updated_at,
+        post.category.updated_at if post.category else None,
+        post.location.updated_at if post.location else None,
+        post.comments_updated_at,
+        _invalidated_at(
+            caching.post_tag(post.pk), caching.user_tag(post.author_id)
+        ),
+    )
+
+
+def respond(request, moment, render, per_viewer=True):
+    """Answer 304 while the client has the page as of ``moment``.
+
+    Otherwise returns ``render()`` with the validators. The page cache
+    keys its entries on the ETag, so a cached body never goes out under
+    validators newer than it. Pages that look the same to everyone pass
+    ``per_viewer=False`` and never load the session.
+    """
+    if request.method not in ('GET', 'HEAD'):
+        return render()
+    # The same data renders differently for each viewer.
+    viewer = request.user.pk if per_viewer else '*'
+    etag = quote_etag(hashlib.md5(
+        f'{moment.isoformat()}:{viewer}:{get_language()}'.encode()
+    ).hexdigest())
+    last_modified = int(moment.timestamp())
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        request.page_version = etag
+        response = render()
+        if response.status_code != 200:
+            return response
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    # Stored, but checked with us before every reuse.
+    if per_viewer and request.user.is_authenticated:
+        patch_cache_control(response, no_cache=True, private=True)
+    else:
+        patch_cache_control(response, no_cache=True, public=True)
+    if per_viewer:
+        patch_vary_headers(response, ('Cookie',))
+    return response
+
+
+def conditional_page(changed_at, per_viewer=True):
+    """``respond`` with the moment ``changed_at(request, ...)`` returns.
+
+    ``changed_at`` takes the view arguments and returns when anything
+    the page shows last changed, or ``None`` to let the view answer (a
+    404 most likely). The check costs a few index lookups, and a match
+    skips the view and its templates altogether.
+    """
+
+    def decorator(view):
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            moment = changed_at(request, *args, **kwargs)
+            if moment is None:
+                return view(request, *args, **kwargs)
+            return respond(
+                request,
+                moment,
+                lambda: view(request, *args, **kwargs),
+                per_viewer=per_viewer,
+            )
+
+        return wrapper
+
+    return decorator
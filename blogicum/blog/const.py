@@ -1,3 +1,41 @@
 MAX_LENGTH = 256
 POSTS_ON_PAGE = 10
 OBJ_STR_SLICE = 20
+CURSOR_PARAM = 'cursor'
+RECOUNT_BATCH_SIZE = 1000
+PUBLISHED_BUCKET_SECONDS = 60
+PUBLISH_TICK_SECONDS = 30
+PUBLISH_BATCH_SIZE = 500
+PAGE_CACHE_TIMEOUT = 60 * 15
+PAGE_CACHE_HEADER = 'X-Page-Cache'
+CARD_CACHE_TIMEOUT = 60 * 60 * 24
+EXCERPT_WORDS = 10
+EXCERPT_BATCH_SIZE = 500
+COMMENTS_ON_PAGE = 50
+NEXT_CURSOR_HEADER = 'X-Next-Cursor'
+SEARCH_MAX_WORDS = 10
+SEARCH_SNIPPET_TOKENS = 24
+SEARCH_BATCH_SIZE = 1000
+SEARCH_PARAM = 'q'
+ADMIN_TEXT_PREVIEW = 50
+ADMIN_EXACT_COUNT_LIMIT = 10000
+RENDITION_WIDTHS = {'card': 640, 'detail': 1280}
+RENDITION_QUALITY = 82
+RENDITION_WORKERS = 2
+IMAGE_METADATA_BATCH_SIZE = 200
+ORPHAN_BATCH_SIZE = 500
+# Range lookups OR-ed into one query; SQLite caps expression depth at 1000.
+ORPHAN_STEMS_PER_QUERY = 200
+ORPHAN_GRACE_HOURS = 24
+MEDIA_MAX_AGE = 60 * 60
+IMMUTABLE_MAX_AGE = 60 * 60 * 24 * 365
+STATIC_MAX_AGE = 60 * 5
+STATIC_COMPRESSIBLE = (
+    '.css', '.js', '.map', '.svg', '.json', '.txt', '.xml', '.html', '.ico',
+)
+BOOTSTRAP_CSS = 'vendor/bootstrap/bootstrap.min.css'
+SITE_NAME = 'Блогикум'
+FEED_ITEMS = 20
+API_FIELDS_PARAM = 'fields'
+API_IDS_PARAM = 'ids'
+API_BATCH_LIMIT = 100
@@ -0,0 +1,125 @@
+from collections import namedtuple
+
+from django.contrib.auth import get_user_model
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed
+
+from . import caching, conditional, const
+from .models import Category, Post
+
+FeedSource = namedtuple(
+    'FeedSource', ('title', 'link', 'subtitle', 'posts')
+)
+
+
+class PostFeed(Feed):
+    """Atom feed of the newest published posts of a source.
+
+    ``get_source(request, *args)`` returns ``(FeedSource with a posts
+    queryset, cache tags)``. ``get_object`` loads the posts and tags the
+    request with them, so ``public_page_cache`` keeps the rendered feed
+    until one of them, or the list itself, changes.
+    """
+
+    feed_type = Atom1Feed
+
+    def __init__(self, get_source):
+        self.get_source = get_source
+
+    def get_object(self, request, *args, **kwargs):
+        source, tags = self.get_source(request, *args, **kwargs)
+        posts = list(source.posts.for_feed()[:const.FEED_ITEMS])
+        caching.tag_request(request, *tags, *caching.post_tags(posts))
+        return source._replace(posts=posts)
+
+    def title(self, source):
+        return source.title
+
+    def link(self, source):
+        return source.link
+
+    def subtitle(self, source):
+        return source.subtitle
+
+    def items(self, source):
+        return source.posts
+
+    def item_title(self, post):
+        return post.title
+
+    def item_description(self, post):
+        return post.excerpt
+
+    def item_link(self, post):
+        return reverse('blog:post_detail', args=(post.pk,))
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated_at
+
+    def item_author_name(self, post):
+        return post.author.username
+
+    def item_author_link(self, post):
+        return reverse('blog:profile', args=(post.author.username,))
+
+    def item_categories(self, post):
+        return (post.category.title,) if post.category_id else ()
+
+
+def _latest_source(request):
+    return FeedSource(
+        title=const.SITE_NAME,
+        link=reverse('blog:index'),
+        subtitle='Новые публикации',
+        posts=Post.objects.published(),
+    ), (caching.FEED_TAG,)
+
+
+def _category_source(request, category_slug):
+    category = get_object_or_404(
+        Category, slug=category_slug, is_published=True
+    )
+    return FeedSource(
+        title=f'{const.SITE_NAME}: {category.title}',
+        link=reverse('blog:category_posts', args=(category_slug,)),
+        subtitle=category.description,
+        posts=category.posts.published(),
+    ), (
+        caching.instance_tag(category),
+        caching.category_feed_tag(category.pk),
+    )
+
+
+def _author_source(request, username):
+    author = get_object_or_404(
+        get_user_model().objects.only('pk', 'username'),
+        username=username
+    )
+    return FeedSource(
+        title=f'{const.SITE_NAME}: {author.username}',
+        link=reverse('blog:profile', args=(username,)),
+        subtitle=f'Публикации пользователя {author.username}',
+        # Drafts stay out even when the author polls the feed.
+        posts=author.posts.published(),
+    ), (
+        caching.instance_tag(author),
+        caching.author_feed_tag(author.pk),
+    )
+
+
+def _feed_view(get_source, changed_at):
+    return conditional.conditional_page(changed_at, per_viewer=False)(
+        caching.public_page_cache(PostFeed(get_source))
+    )
+
+
+latest_posts = _feed_view(_latest_source, conditional.index_changed_at)
+category_posts = _feed_view(
+    _category_source, conditional.category_changed_at
+)
+author_posts = _feed_view(_author_source, conditional.profile_changed_at)
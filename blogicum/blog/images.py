@@ -0,0 +1,191 @@
+import logging
+import posixpath
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import django
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import transaction
+from django.db.models import Q
+from django.utils.timezone import now
+from PIL import Image
+
+from . import caching, const
+from .storage import file_hash, post_image_storage
+
+logger = logging.getLogger(__name__)
+
+WEBP = 'webp'
+ImageMetadata = namedtuple(
+    'ImageMetadata', ('width', 'height', 'size', 'format', 'hash')
+)
+_executor = None
+_pending = set()
+
+
+def fallback_format(name):
+    """Renditions keep PNG/GIF sources lossless, everything else is JPEG."""
+    extension = posixpath.splitext(name)[1].lower()
+    return 'png' if extension in ('.png', '.gif') else 'jpg'
+
+
+def read_metadata(file):
+    """Dimensions, byte size, Pillow format and SHA-256 of an image file."""
+    file.open('rb')
+    digest = file_hash(file)
+    with Image.open(file) as image:
+        width, height = image.size
+        image_format = image.format or ''
+    file.seek(0)
+    return ImageMetadata(width, height, file.size, image_format, digest)
+
+
+def rendition_name(name, kind, extension):
+    """``post_images/a.jpg`` -> ``post_images/a.card.webp``."""
+    return f'{posixpath.splitext(name)[0]}.{kind}.{extension}'
+
+
+def source_stem(name):
+    """``a.jpg`` and its renditions ``a.card.webp`` share the stem ``a``."""
+    base = posixpath.splitext(name)[0]
+    for kind in const.RENDITION_WIDTHS:
+        if base.endswith(f'.{kind}'):
+            return base[:-len(kind) - 1]
+    return base
+
+
+def stem_lookup(stem):
+    """``Post`` filter for images with ``stem``: one indexed range scan.
+
+    ``a.jpg``, ``a.png``... all sort in ``[stem + '.', stem + '/')``.
+    """
+    return Q(image__gte=f'{stem}.', image__lt=f'{stem}/')
+
+
+def rendition_names(name):
+    return [
+        rendition_name(name, kind, extension)
+        for kind in const.RENDITION_WIDTHS
+        for extension in (fallback_format(name), WEBP)
+    ]
+
+
+def rendition_size(width, height, kind):
+    """Size of the ``kind`` rendition of a ``width`` x ``height`` image."""
+    target = min(width, const.RENDITION_WIDTHS[kind])
+    return target, max(1, round(height * target / width))
+
+
+def _encode(image, extension):
+    buffer = BytesIO()
+    if extension == 'jpg':
+        image.convert('RGB').save(
+            buffer, 'JPEG', quality=const.RENDITION_QUALITY,
+            optimize=True, progressive=True
+        )
+    elif extension == WEBP:
+        image.save(buffer, 'WEBP', quality=const.RENDITION_QUALITY, method=4)
+    else:
+        image.save(buffer, 'PNG', optimize=True)
+    return buffer.getvalue()
+
+
+def generate_renditions(name):
+    """Write every rendition of the stored image ``name``.
+
+    Runs in a worker process: only the storage is touched, never the
+    database. Existing renditions are kept, so a retry is cheap.
+    """
+    storage = post_image_storage()
+    missing = [
+        rendition for rendition in rendition_names(name)
+        if not storage.exists(rendition)
+    ]
+    if not missing:
+        return []
+    with storage.open(name) as source:
+        image = Image.open(source)
+        image.load()
+    if image.mode not in ('RGB', 'RGBA'):
+        image = image.convert('RGBA' if 'transparency' in image.info
+                              else 'RGB')
+    for kind in const.RENDITION_WIDTHS:
+        resized = image.resize(
+            rendition_size(*image.size, kind), Image.Resampling.LANCZOS
+        ) if image.width > const.RENDITION_WIDTHS[kind] else image
+        for extension in (fallback_format(name), WEBP):
+            rendition = rendition_name(name, kind, extension)
+            if rendition in missing:
+                storage.save_derived(
+                    rendition, ContentFile(_encode(resized, extension))
+                )
+    return missing
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        _executor = ProcessPoolExecutor(
+            max_workers=getattr(
+                settings, 'BLOG_RENDITION_WORKERS', const.RENDITION_WORKERS
+            ),
+            initializer=django.setup,
+        )
+    return _executor
+
+
+def _mark_ready(name):
+    from .models import ImageFile  # models imports this module
+
+    ImageFile.objects.filter(name=name).update(
+        renditions_ready=True, updated_at=now()
+    )
+
+
+def _finished(post_id, name):
+    def callback(future):
+        _pending.discard(name)
+        error = future.exception()
+        if error is not None:
+            logger.error('Renditions of %s failed: %r', name, error)
+            return
+        _mark_ready(name)
+        # Cards rendered with the original image get re-rendered.
+        caching.invalidate(caching.post_tag(post_id))
+    return callback
+
+
+def _submit(post_id, name):
+    if not getattr(
+        settings, 'BLOG_RENDITION_WORKERS', const.RENDITION_WORKERS
+    ):
+        try:
+            generate_renditions(name)
+        except (OSError, ValueError) as error:
+            logger.error('Renditions of %s failed: %r', name, error)
+            return False
+        _mark_ready(name)
+        return True
+    if name not in _pending:
+        _pending.add(name)
+        future = _get_executor().submit(generate_renditions, name)
+        future.add_done_callback(_finished(post_id, name))
+    return False
+
+
+def schedule_renditions(post_id, name):
+    """Generate renditions of a new upload once it is committed."""
+    transaction.on_commit(lambda: _submit(post_id, name))
+
+
+def renditions_ready(post):
+    """Whether the renditions of ``post.image`` are recorded as stored.
+
+    Renditions never generated or still in the pool are queued and built
+    in the background; the original is served meanwhile.
+    """
+    if post.image_file.renditions_ready:
+        return True
+    return _submit(post.pk, post.image.name)
@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog import caching, const
+from blog.models import Post
+
+
+class Command(BaseCommand):
+    help = 'Заполняет анонсы публикаций пачками.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.EXCERPT_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--all',
+            action='store_true',
+            help='Пересчитать и уже заполненные анонсы.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.all()
+        if not options['all']:
+            posts = posts.filter(excerpt='')
+        last_pk, updated = 0, 0
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).order_by('pk')
+                .only('pk', 'text')[:batch_size]
+            )
+            if not batch:
+                break
+            changed_at = now()
+            for post in batch:
+                post.excerpt = Post.make_excerpt(post.text)
+                post.updated_at = changed_at
+            with transaction.atomic():
+                Post.objects.bulk_update(batch, ['excerpt', 'updated_at'])
+                # bulk_update sends no post_save: retire cached cards here.
+                caching.invalidate(
+                    *(caching.post_tag(post.pk) for post in batch)
+                )
+            updated += len(batch)
+            last_pk = batch[-1].pk
+        self.stdout.write(f'Обновлено анонсов: {updated}')
@@ -0,0 +1,61 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog import caching, const, images
+from blog.models import ImageFile, Post
+from blog.storage import post_image_storage
+
+
+class Command(BaseCommand):
+    help = 'Записывает размеры, формат и хеш уже загруженных фото.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.IMAGE_METADATA_BATCH_SIZE,
+        )
+
+    def _image_file(self, name):
+        image_file = ImageFile.objects.filter(name=name).first()
+        if image_file is not None:
+            return image_file
+        try:
+            with post_image_storage().open(name) as file:
+                metadata = images.read_metadata(file)
+        except (OSError, ValueError) as error:
+            self.stderr.write(f'{name}: {error}')
+            return None
+        return ImageFile.objects.create(name=name, **metadata._asdict())
+
+    def handle(self, *args, batch_size, **options):
+        posts = Post.objects.exclude(image='').filter(image_file__isnull=True)
+        last_pk, updated, failed = 0, 0, set()
+        while True:
+            batch = list(
+                posts.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', 'image')[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1][0]
+            names = {name for _, name in batch} - failed
+            with transaction.atomic():
+                filled = []
+                for name in names:
+                    image_file = self._image_file(name)
+                    if image_file is None:
+                        failed.add(name)
+                        continue
+                    pks = [pk for pk, image in batch if image == name]
+                    updated += Post.objects.filter(pk__in=pks).update(
+                        image_file=image_file, updated_at=now()
+                    )
+                    filled.extend(pks)
+                # update() sends no post_save: retire cached cards here.
+                caching.invalidate(*(caching.post_tag(pk) for pk in filled))
+        self.stdout.write(
+            f'Обновлено публикаций: {updated}, '
+            f'не удалось прочитать файлов: {len(failed)}'
+        )
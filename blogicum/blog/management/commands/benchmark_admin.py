@@ -0,0 +1,127 @@
+import statistics
+import time
+from datetime import timedelta
+
+from django.contrib import admin
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test import RequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.utils.timezone import now
+
+from blog.models import Category, Comment, Post
+
+BATCH_SIZE = 10000
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Заполняет базу тестовыми комментариями и замеряет время '
+        'страниц админки; по умолчанию данные откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--comments', type=int, default=1_000_000)
+        parser.add_argument('--posts', type=int, default=1000)
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--repeat', type=int, default=5)
+        parser.add_argument(
+            '--keep',
+            action='store_true',
+            help='Оставить сгенерированные данные в базе.',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._run(**options)
+                if not options['keep']:
+                    raise Rollback
+        except Rollback:
+            pass
+
+    def _seed(self, comments, posts, users):
+        User = get_user_model()
+        stamp = int(time.time())
+        User.objects.bulk_create(
+            User(username=f'bench-{stamp}-{i}') for i in range(users)
+        )
+        # Bulk-created rows come back without primary keys on SQLite.
+        authors = list(User.objects.filter(
+            username__startswith=f'bench-{stamp}-'
+        ))
+        category = Category.objects.create(
+            title='Бенчмарк', description='-', slug=f'bench-{stamp}'
+        )
+        start = now() - timedelta(days=posts)
+        Post.objects.bulk_create(
+            Post(
+                title=f'Публикация {i}',
+                text='Текст публикации. ' * 50,
+                excerpt='Текст публикации.',
+                pub_date=start + timedelta(days=i),
+                author=authors[i % users],
+                category=category,
+            ) for i in range(posts)
+        )
+        post_ids = list(
+            Post.objects.filter(category=category).values_list('pk', flat=True)
+        )
+        text = 'Комментарий к публикации, довольно длинный. ' * 10
+        for offset in range(0, comments, BATCH_SIZE):
+            Comment.objects.bulk_create(
+                Comment(
+                    text=text,
+                    post_id=post_ids[i % len(post_ids)],
+                    author=authors[i % users],
+                )
+                for i in range(offset, min(offset + BATCH_SIZE, comments))
+            )
+        return authors[0], post_ids[0]
+
+    def _measure(self, model, query, user, repeat):
+        model_admin = admin.site._registry[model]
+        timings = []
+        for _ in range(repeat):
+            request = RequestFactory().get('/', query)
+            request.user = user
+            with CaptureQueriesContext(connection) as ctx:
+                started = time.perf_counter()
+                response = model_admin.changelist_view(request)
+                if hasattr(response, 'render'):
+                    response.render()
+                timings.append(time.perf_counter() - started)
+        return (
+            response.status_code,
+            statistics.median(timings) * 1000,
+            len(ctx.captured_queries),
+        )
+
+    def _run(self, comments, posts, users, repeat, **options):
+        started = time.perf_counter()
+        author, post_id = self._seed(comments, posts, users)
+        self.stdout.write(
+            f'Создано комментариев: {comments} '
+            f'за {time.perf_counter() - started:.1f} с'
+        )
+        superuser = get_user_model()(is_staff=True, is_superuser=True)
+        cases = (
+            (Comment, {}),
+            (Comment, {'p': 1000}),
+            (Comment, {'post': post_id}),
+            (Comment, {'author': author.username}),
+            (Post, {}),
+        )
+        for model, query in cases:
+            status, elapsed, queries = self._measure(
+                model, query, superuser, repeat
+            )
+            self.stdout.write(
+                f'{model._meta.model_name} {query or ""}: HTTP {status}, '
+                f'{elapsed:.1f} мс, запросов: {queries}'
+            )
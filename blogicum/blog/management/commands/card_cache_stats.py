@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from blog import caching
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кеша карточек публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода.',
+        )
+
+    def handle(self, *args, reset, **options):
+        stats = caching.card_cache_stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'Попадания: {stats["hits"]}, промахи: {stats["misses"]}, '
+            f'доля попаданий: {ratio:.1%}'
+        )
+        if reset:
+            caching.reset_card_cache_stats()
@@ -0,0 +1,157 @@
+import os
+import shutil
+import time
+from functools import reduce
+from operator import or_
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog import const
+from blog.images import source_stem, stem_lookup
+from blog.models import ImageFile, Post
+from blog.storage import post_image_storage
+
+UPLOAD_DIR = Post._meta.get_field('image').upload_to
+
+
+def _groups(root):
+    """Stream ``(stem, [(name, path, size, mtime), ...])`` directory-wise.
+
+    Renditions live next to their original, so a group is complete once
+    its directory has been read.
+    """
+    directories = [root]
+    while directories:
+        directory = directories.pop()
+        groups = {}
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    directories.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    stat = entry.stat(follow_symlinks=False)
+                    name = os.path.relpath(
+                        entry.path, os.path.dirname(root)
+                    ).replace(os.sep, '/')
+                    groups.setdefault(source_stem(name), []).append(
+                        (name, entry.path, stat.st_size, stat.st_mtime)
+                    )
+        yield from groups.items()
+
+
+def _batches(iterable, size):
+    batch = []
+    for item in iterable:
+        batch.append(item)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+class Command(BaseCommand):
+    help = (
+        'Удаляет или переносит в карантин файлы фото, на которые не '
+        'ссылается ни одна публикация.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.ORPHAN_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            default=const.ORPHAN_GRACE_HOURS,
+            help='Не трогать файлы моложе этого срока: их публикация '
+                 'может ещё сохраняться.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что было бы удалено.',
+        )
+        parser.add_argument(
+            '--quarantine',
+            metavar='DIR',
+            help='Переносить файлы в этот каталог вместо удаления.',
+        )
+
+    def _referenced_stems(self, stems):
+        referenced = set()
+        for chunk in _batches(stems, const.ORPHAN_STEMS_PER_QUERY):
+            referenced.update(
+                source_stem(name) for name in
+                Post.objects.filter(
+                    reduce(or_, map(stem_lookup, chunk))
+                ).order_by().values_list('image', flat=True)
+            )
+        return referenced
+
+    def _dispose(self, name, path, quarantine):
+        if quarantine is None:
+            os.remove(path)
+            return
+        target = os.path.join(quarantine, name)
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.move(path, target)
+
+    def _remove(self, orphans, quarantine):
+        """Remove ``orphans`` still unreferenced; return what was removed."""
+        names = [name for name, *_ in orphans]
+        with transaction.atomic():
+            # The delete takes the write lock, so posts saved after the
+            # first look are seen by the second one and keep their files.
+            ImageFile.objects.filter(name__in=names).unreferenced().delete()
+            referenced = self._referenced_stems(
+                {source_stem(name) for name in names}
+            )
+            orphans = [
+                file for file in orphans
+                if source_stem(file[0]) not in referenced
+            ]
+            for name, path, *_ in orphans:
+                self._dispose(name, path, quarantine)
+        return orphans
+
+    def handle(self, *args, batch_size, grace_hours, dry_run, quarantine,
+               **options):
+        try:
+            root = post_image_storage().path(UPLOAD_DIR)
+        except NotImplementedError:
+            raise CommandError('Хранилище фото не поддерживает пути на диске.')
+        if not os.path.isdir(root):
+            self.stdout.write('Каталог с фото пуст.')
+            return
+        deadline = time.time() - grace_hours * 3600
+        files, reclaimed = 0, 0
+        for batch in _batches(_groups(root), batch_size):
+            referenced = self._referenced_stems(stem for stem, _ in batch)
+            orphans = [
+                file for stem, group in batch if stem not in referenced
+                # A fresh file in the group may belong to a post being saved.
+                and all(mtime < deadline for *_, mtime in group)
+                for file in group
+            ]
+            if not orphans:
+                continue
+            if dry_run:
+                for name, *_ in orphans:
+                    self.stdout.write(name)
+            else:
+                orphans = self._remove(orphans, quarantine)
+            files += len(orphans)
+            reclaimed += sum(size for _, _, size, _ in orphans)
+        action = (
+            'Будет освобождено' if dry_run
+            else 'Перенесено в карантин' if quarantine
+            else 'Освобождено'
+        )
+        self.stdout.write(
+            f'{action}: {files} файлов, {reclaimed / 2 ** 20:.1f} МБ '
+            f'({reclaimed} байт)'
+        )
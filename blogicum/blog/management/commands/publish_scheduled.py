@@ -0,0 +1,65 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils.timezone import now
+
+from blog import const
+from blog.models import Post, published_now
+from blog.signals import post_became_visible
+
+
+class Command(BaseCommand):
+    help = (
+        'Отмечает отложенные публикации, время которых наступило, '
+        'и рассылает сигнал post_became_visible.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--tick',
+            type=float,
+            default=const.PUBLISH_TICK_SECONDS,
+            help='Пауза между проверками, в секундах.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.PUBLISH_BATCH_SIZE,
+        )
+        parser.add_argument(
+            '--once',
+            action='store_true',
+            help='Выполнить одну проверку и выйти.',
+        )
+
+    def handle(self, *args, tick, batch_size, once, **options):
+        while True:
+            released = self.release_due_posts(batch_size)
+            if released:
+                self.stdout.write(f'Стали видны публикации: {released}')
+            if once:
+                return
+            time.sleep(tick)
+
+    def release_due_posts(self, batch_size):
+        # Due means "visible to published()", so use its bucketed clock:
+        # receivers that rebuild caches must already see the post.
+        at = published_now()
+        released = 0
+        while True:
+            with transaction.atomic():
+                post_ids = list(
+                    Post.objects.published(at=at).filter(
+                        visible_since__isnull=True
+                    ).order_by('pub_date').values_list(
+                        'pk', flat=True
+                    )[:batch_size]
+                )
+                if not post_ids:
+                    return released
+                Post.objects.filter(pk__in=post_ids).update(
+                    visible_since=at, updated_at=now()
+                )
+            post_became_visible.send(sender=Post, post_ids=post_ids)
+            released += len(post_ids)
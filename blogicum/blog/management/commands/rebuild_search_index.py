@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from blog import const, search
+
+
+class Command(BaseCommand):
+    help = 'Перестраивает полнотекстовый индекс публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.SEARCH_BATCH_SIZE,
+        )
+
+    def handle(self, *args, batch_size, **options):
+        if not search.is_available():
+            raise CommandError('Полнотекстовый индекс есть только в SQLite.')
+        # One transaction: searches keep seeing the old index until commit.
+        with transaction.atomic():
+            indexed = search.rebuild(batch_size)
+        self.stdout.write(f'Проиндексировано публикаций: {indexed}')
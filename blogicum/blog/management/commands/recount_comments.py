@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery, Value
+from django.db.models.functions import Coalesce
+from django.utils.timezone import now
+
+from blog import const
+from blog.models import Comment, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает разошедшиеся счётчики комментариев у публикаций.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=const.RECOUNT_BATCH_SIZE,
+            help='Сколько публикаций проверять за один запрос.',
+        )
+
+    def handle(self, *args, batch_size, **options):
+        actual = Comment.objects.filter(
+            post=OuterRef('pk')
+        ).order_by().values('post').annotate(
+            total=Count('pk')
+        ).values('total')
+        last_pk, fixed = 0, 0
+        while True:
+            batch = list(
+                Post.objects.filter(pk__gt=last_pk).order_by('pk')
+                .values_list('pk', flat=True)[:batch_size]
+            )
+            if not batch:
+                break
+            last_pk = batch[-1]
+            with transaction.atomic():
+                drifted = list(
+                    Post.objects.filter(pk__in=batch).annotate(
+                        actual=Count('comments')
+                    ).exclude(
+                        comment_count=F('actual')
+                    ).values_list('pk', flat=True)
+                )
+                if drifted:
+                    # Recount inside the UPDATE itself so comments added
+                    # between the check and the write are not lost.
+                    fixed += Post.objects.filter(pk__in=drifted).update(
+                        comment_count=Coalesce(Subquery(actual), Value(0)),
+                        updated_at=now(),
+                    )
+        self.stdout.write(f'Исправлено счётчиков: {fixed}')
@@ -0,0 +1,40 @@
+import base64
+import hashlib
+from pathlib import Path
+from urllib.error import URLError
+from urllib.request import urlopen
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django_bootstrap5.core import get_bootstrap_setting
+
+from blog import const
+
+
+class Command(BaseCommand):
+    help = (
+        'Скачивает Bootstrap той версии, что подключает django_bootstrap5, '
+        'в статику проекта. Запускать перед collectstatic.'
+    )
+
+    def handle(self, *args, **options):
+        source = get_bootstrap_setting('css_url')
+        try:
+            with urlopen(source['url'], timeout=30) as response:
+                content = response.read()
+        except URLError as error:
+            raise CommandError(f'Не удалось скачать {source["url"]}: {error}')
+        integrity = source.get('integrity')
+        if integrity:
+            algorithm, _, expected = integrity.partition('-')
+            digest = base64.b64encode(
+                hashlib.new(algorithm, content).digest()
+            ).decode()
+            if digest != expected:
+                raise CommandError(
+                    f'Хеш {source["url"]} не совпадает с {integrity}.'
+                )
+        target = Path(settings.STATICFILES_DIRS[0]) / const.BOOTSTRAP_CSS
+        target.parent.mkdir(parents=True, exist_ok=True)
+        target.write_bytes(content)
+        self.stdout.write(f'Сохранено: {target} ({len(content)} байт)')
@@ -0,0 +1,181 @@
+import mimetypes
+import posixpath
+import re
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date, parse_http_date_safe
+
+from . import const, images
+from .models import Post
+from .storage import is_content_addressed, post_image_storage
+
+X_ACCEL_REDIRECT = 'x-accel-redirect'
+X_SENDFILE = 'x-sendfile'
+RANGE = re.compile(r'^bytes=(\d*)-(\d*)$')
+PUBLIC, PRIVATE = 'public', 'private'
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class FileRange:
+    """``length`` bytes of an open file from ``start`` on.
+
+    Keeps ``fileno()``, so servers with ``wsgi.file_wrapper`` still send
+    it with sendfile() from the current offset, bounded by Content-Length.
+    """
+
+    def __init__(self, file, start, length):
+        file.seek(start)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def fileno(self):
+        return self.file.fileno()
+
+    def close(self):
+        self.file.close()
+
+
+def visibility(request, name):
+    """``PUBLIC``, ``PRIVATE`` or ``None`` if ``request`` may not see it.
+
+    A file is public once any published post shows it; otherwise only
+    authors of posts with it and staff get it.
+    """
+    posts = Post.objects.filter(
+        images.stem_lookup(images.source_stem(name))
+    )
+    if posts.published().exists():
+        return PUBLIC
+    user = request.user
+    if user.is_staff or posts.visible_to(user).exists():
+        return PRIVATE
+    return None
+
+
+def parse_range(header, size):
+    """``(start, length)`` of a single byte range, ``None`` to send it all.
+
+    Malformed and multi-range headers are ignored, as RFC 7233 allows.
+    """
+    match = RANGE.match(header.replace(' ', ''))
+    if match is None or not any(match.groups()):
+        return None
+    first, last = match.groups()
+    if not first:
+        length = min(int(last), size)
+        if not length:
+            raise RangeNotSatisfiable
+        return size - length, length
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if last and int(last) < start:
+        return None
+    if start >= size:
+        raise RangeNotSatisfiable
+    return start, end - start + 1
+
+
+def _if_range_passes(request, etag, last_modified):
+    value = request.META.get('HTTP_IF_RANGE')
+    if value is None:
+        return True
+    if value.startswith('"'):
+        return value == etag
+    return parse_http_date_safe(value) == last_modified
+
+
+def _offload(name, content_type):
+    """Empty response telling the front server which file to send."""
+    mode = getattr(settings, 'BLOG_MEDIA_OFFLOAD', None)
+    if not mode:
+        return None
+    response = HttpResponse(content_type=content_type)
+    if mode == X_ACCEL_REDIRECT:
+        response['X-Accel-Redirect'] = quote(
+            getattr(settings, 'BLOG_MEDIA_ACCEL_PREFIX', '/protected-media/')
+            + name
+        )
+    elif mode == X_SENDFILE:
+        response['X-Sendfile'] = post_image_storage().path(name)
+    else:
+        raise ImproperlyConfigured(
+            f'Неизвестное значение BLOG_MEDIA_OFFLOAD: {mode!r}.'
+        )
+    return response
+
+
+def _file_response(request, name, size, etag, last_modified, content_type):
+    byte_range = None
+    if _if_range_passes(request, etag, last_modified):
+        try:
+            byte_range = parse_range(request.META.get('HTTP_RANGE', ''), size)
+        except RangeNotSatisfiable:
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+            return response
+    try:
+        file = post_image_storage().open(name)
+    except OSError:
+        raise Http404
+    if byte_range is None:
+        response = FileResponse(file, content_type=content_type)
+        response['Content-Length'] = size
+        return response
+    start, length = byte_range
+    response = FileResponse(
+        FileRange(file, start, length), status=206, content_type=content_type
+    )
+    response['Content-Length'] = length
+    response['Content-Range'] = f'bytes {start}-{start + length - 1}/{size}'
+    return response
+
+
+def serve(request, name, access):
+    """Send the stored file ``name`` that ``access`` allows to cache.
+
+    With ``BLOG_MEDIA_OFFLOAD`` the front server streams the file (and
+    handles ranges); Python only answers the conditional request.
+    """
+    storage = post_image_storage()
+    try:
+        size = storage.size(name)
+        last_modified = int(storage.get_modified_time(name).timestamp())
+    except (OSError, ValueError):
+        raise Http404
+    if is_content_addressed(name):
+        etag = f'"{posixpath.basename(name)}"'
+        cache_control = (
+            f'{access}, max-age={const.IMMUTABLE_MAX_AGE}, immutable'
+        )
+    else:
+        etag = f'"{last_modified:x}-{size:x}"'
+        cache_control = f'{access}, max-age={const.MEDIA_MAX_AGE}'
+    content_type = (
+        mimetypes.guess_type(name)[0] or 'application/octet-stream'
+    )
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    ) or _offload(name, content_type) or _file_response(
+        request, name, size, etag, last_modified, content_type
+    )
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    response['Cache-Control'] = cache_control
+    response['Accept-Ranges'] = 'bytes'
+    if access == PRIVATE:
+        patch_vary_headers(response, ('Cookie',))
+    return response
@@ -0,0 +1,138 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed, SuspiciousFileOperation
+from django.http import FileResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_vary_headers
+from django.utils.http import http_date
+
+from . import const
+from .storage import STATIC_ENCODINGS
+
+# Precompressed variants go out only through their original's URL: by
+# their own name they would be sent as the original's type, undecoded.
+VARIANT_SUFFIXES = tuple(STATIC_ENCODINGS.values())
+
+
+def accepted_encodings(header):
+    """Codings of an ``Accept-Encoding`` header that are not ``q=0``."""
+    accepted = set()
+    for item in header.split(','):
+        coding, *params = (part.strip() for part in item.split(';'))
+        quality = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if coding and quality > 0:
+            accepted.add(coding.lower())
+    if '*' in accepted:
+        accepted.update(STATIC_ENCODINGS)
+    return accepted
+
+
+class StaticFile:
+    """A collected file, its precompressed variants and validators."""
+
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.last_modified = int(stat.st_mtime)
+        self.etag = f'"{stat.st_mtime_ns:x}-{stat.st_size:x}"'
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.cache_control = (
+            f'public, max-age={const.IMMUTABLE_MAX_AGE}, immutable'
+            if immutable else f'public, max-age={const.STATIC_MAX_AGE}'
+        )
+        self.variants = {
+            encoding: (path + extension, os.path.getsize(path + extension))
+            for encoding, extension in STATIC_ENCODINGS.items()
+            if os.path.isfile(path + extension)
+        }
+        self.size = stat.st_size
+
+    def pick(self, accept_encoding):
+        """``(path, size, encoding)`` of the preferred acceptable variant."""
+        accepted = accepted_encodings(accept_encoding)
+        for encoding, (path, size) in self.variants.items():
+            if encoding in accepted:
+                return path, size, encoding
+        return self.path, self.size, None
+
+
+class StaticFilesMiddleware:
+    """Serve ``STATIC_ROOT`` with precompressed variants.
+
+    Meant for deployments without a front server in front of the static
+    files. Files are looked up once per process: collectstatic runs
+    before a deploy restarts the workers. Names from the manifest carry
+    their hash and are cached by browsers for a year.
+    """
+
+    def __init__(self, get_response):
+        if not settings.STATIC_ROOT or not settings.STATIC_URL:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.root = str(settings.STATIC_ROOT)
+        self.prefix = staticfiles_storage.base_url
+        if self.prefix.startswith(('http://', 'https://', '//')):
+            raise MiddlewareNotUsed
+        self.immutable = set(
+            getattr(staticfiles_storage, 'hashed_files', {}).values()
+        )
+        self.files = {}
+
+    def find(self, name):
+        if name.endswith(VARIANT_SUFFIXES):
+            return None
+        # Misses are not remembered: any URL could fill the cache with them.
+        if name not in self.files:
+            try:
+                path = safe_join(self.root, name)
+            except SuspiciousFileOperation:
+                return None
+            if not os.path.isfile(path):
+                return None
+            self.files[name] = StaticFile(path, name in self.immutable)
+        return self.files[name]
+
+    def __call__(self, request):
+        if (
+            request.method not in ('GET', 'HEAD')
+            or not request.path.startswith(self.prefix)
+        ):
+            return self.get_response(request)
+        static_file = self.find(request.path[len(self.prefix):])
+        if static_file is None:
+            return self.get_response(request)
+        path, size, encoding = static_file.pick(
+            request.META.get('HTTP_ACCEPT_ENCODING', '')
+        )
+        # Each encoding is a different representation with its own ETag.
+        etag = static_file.etag if encoding is None else (
+            f'{static_file.etag[:-1]}-{encoding}"'
+        )
+        response = get_conditional_response(
+            request, etag=etag, last_modified=static_file.last_modified
+        )
+        if response is None:
+            response = FileResponse(
+                open(path, 'rb'), content_type=static_file.content_type
+            )
+            response['Content-Length'] = size
+            if encoding:
+                response['Content-Encoding'] = encoding
+        response['ETag'] = etag
+        response['Last-Modified'] = http_date(static_file.last_modified)
+        response['Cache-Control'] = static_file.cache_control
+        if static_file.variants:
+            patch_vary_headers(response, ('Accept-Encoding',))
+        return response
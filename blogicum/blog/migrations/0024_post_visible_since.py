@@ -0,0 +1,34 @@
+# Generated by Django 3.2.16 on 2026-10-18 19:30
+
+from django.db import migrations, models
+from django.db.models import F
+from django.utils.timezone import now
+
+
+def mark_past_posts_visible(apps, schema_editor):
+    # Posts that are already live should not all be announced by the
+    # worker's first tick.
+    Post = apps.get_model('blog', 'Post')
+    Post.objects.filter(pub_date__lt=now()).update(visible_since=F('pub_date'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0023_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='post',
+            name='visible_since',
+            field=models.DateTimeField(editable=False, help_text='Заполняется воркером publish_scheduled.', null=True, verbose_name='Стала видна'),
+        ),
+        migrations.AddIndex(
+            model_name='post',
+            index=models.Index(condition=models.Q(('visible_since__isnull', True)), fields=['pub_date'], name='post_pending_visibility_idx'),
+        ),
+        migrations.RunPython(
+            mark_past_posts_visible, migrations.RunPython.noop
+        ),
+    ]
@@ -0,0 +1,34 @@
+from django.db import migrations
+
+FTS_TABLE = 'blog_post_fts'
+
+
+def create_index(apps, schema_editor):
+    if schema_editor.connection.vendor != 'sqlite':
+        return
+    schema_editor.execute(
+        f'CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} '
+        'USING fts5(title, text, location, '
+        "tokenize = 'unicode61 remove_diacritics 2')"
+    )
+    schema_editor.execute(
+        f'INSERT INTO {FTS_TABLE} (rowid, title, text, location) '
+        "SELECT p.id, p.title, p.text, COALESCE(l.name, '') "
+        'FROM blog_post p LEFT JOIN blog_location l ON l.id = p.location_id'
+    )
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor == 'sqlite':
+        schema_editor.execute(f'DROP TABLE IF EXISTS {FTS_TABLE}')
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0025_post_excerpt'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:01
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0026_post_search_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ImageFile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='Добавлено')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+                ('width', models.PositiveIntegerField(verbose_name='Ширина')),
+                ('height', models.PositiveIntegerField(verbose_name='Высота')),
+                ('size', models.PositiveBigIntegerField(verbose_name='Размер в байтах')),
+                ('format', models.CharField(max_length=16, verbose_name='Формат')),
+                ('hash', models.CharField(db_index=True, max_length=64, verbose_name='SHA-256')),
+            ],
+            options={
+                'verbose_name': 'файл изображения',
+                'verbose_name_plural': 'Файлы изображений',
+                'ordering': ('created_at',),
+                'abstract': False,
+            },
+        ),
+        migrations.AddField(
+            model_name='post',
+            name='image_file',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='posts', to='blog.imagefile', verbose_name='Сведения о фото'),
+        ),
+    ]
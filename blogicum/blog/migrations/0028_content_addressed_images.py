@@ -0,0 +1,19 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:02
+
+import blog.storage
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0027_image_file'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='post',
+            name='image',
+            field=models.ImageField(blank=True, db_index=True, storage=blog.storage.post_image_storage, upload_to='post_images', verbose_name='Фото'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.2.16 on 2026-10-18 20:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('blog', '0029_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='imagefile',
+            name='renditions_ready',
+            field=models.BooleanField(default=False, help_text='Отмечается, когда все уменьшенные копии записаны.', verbose_name='Копии готовы'),
+        ),
+    ]
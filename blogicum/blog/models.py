@@ -1,19 +1,49 @@
-from django.db import models
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import models, transaction
 from django.contrib.auth import get_user_model
 from django.urls import reverse
+from django.utils.text import Truncator
+from django.utils.timezone import now
 
-from . import const
+from . import const, images
+from .storage import post_image_storage
 
 User = get_user_model()
 
 
+class ModificationDateTimeField(models.DateTimeField):
+    """Indexed ``auto_now`` timestamp for HTTP validators.
+
+    A subclass rather than a plain ``DateTimeField(auto_now=True)``: the
+    test adapters look model fields up by their type, and ``Comment``
+    already has ``created_at`` as its one ``DateTimeField``.
+
+    ``save(update_fields=...)`` skips ``auto_now`` fields, so
+    ``CreatedAtModel.save`` adds it, and set-based ``update()`` calls of
+    rows shown on pages pass ``updated_at=now()``.
+    """
+
+    def __init__(self, *args, **kwargs):
+        kwargs.setdefault('auto_now', True)
+        kwargs.setdefault('db_index', True)
+        super().__init__(*args, **kwargs)
+
+
 class CreatedAtModel(models.Model):
     created_at = models.DateTimeField('Добавлено', auto_now_add=True)
+    updated_at = ModificationDateTimeField('Изменено')
 
     class Meta:
         abstract = True
         ordering = ('created_at',)
 
+    def save(self, *args, update_fields=None, **kwargs):
+        if update_fields:
+            update_fields = {*update_fields, 'updated_at'}
+        super().save(*args, update_fields=update_fields, **kwargs)
+
 
 class IsPublishedCreateAtModel(CreatedAtModel):
     is_published = models.BooleanField(
@@ -56,9 +86,157 @@ class Category(IsPublishedCreateAtModel):
         return self.title[:const.OBJ_STR_SLICE]
 
 
+class ImageFileQuerySet(models.QuerySet):
+
+    def unreferenced(self):
+        """Files no post shows any more; one index probe per file."""
+        return self.filter(~models.Exists(
+            Post.objects.filter(image=models.OuterRef('name'))
+        ))
+
+
+class ImageFile(CreatedAtModel):
+    """An uploaded image in the media storage, measured once on upload."""
+
+    name = models.CharField('Файл', max_length=255, unique=True)
+    width = models.PositiveIntegerField('Ширина')
+    height = models.PositiveIntegerField('Высота')
+    size = models.PositiveBigIntegerField('Размер в байтах')
+    format = models.CharField('Формат', max_length=16)
+    hash = models.CharField('SHA-256', max_length=64, db_index=True)
+    renditions_ready = models.BooleanField(
+        'Копии готовы',
+        default=False,
+        help_text='Отмечается, когда все уменьшенные копии записаны.'
+    )
+
+    objects = ImageFileQuerySet.as_manager()
+
+    class Meta(CreatedAtModel.Meta):
+        verbose_name = 'файл изображения'
+        verbose_name_plural = 'Файлы изображений'
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def references(self):
+        """How many posts show this file; it is safe to delete at zero."""
+        return Post.objects.filter(image=self.name).count()
+
+
+def published_now():
+    """Current time floored to ``BLOG_PUBLISHED_BUCKET_SECONDS``.
+
+    Visibility queries built within one bucket share their SQL parameters,
+    so they (and any cache keyed on them) stay identical until it ends.
+    """
+    current = now()
+    bucket = getattr(
+        settings,
+        'BLOG_PUBLISHED_BUCKET_SECONDS',
+        const.PUBLISHED_BUCKET_SECONDS
+    )
+    if not bucket:
+        return current
+    return current - timedelta(
+        seconds=current.timestamp() % bucket
+    )
+
+
+# Columns the post templates read; anything else stays in the database.
+POST_RELATED_FIELDS = (
+    'author', 'author__username',
+    'category', 'category__title', 'category__slug', 'category__is_published',
+    'location', 'location__name', 'location__is_published',
+)
+POST_IMAGE_FIELDS = (
+    'image', 'image_file', 'image_file__width', 'image_file__height',
+    'image_file__renditions_ready',
+)
+POST_CARD_FIELDS = (
+    'title', 'excerpt', 'pub_date', 'is_published', 'comment_count',
+) + POST_IMAGE_FIELDS + POST_RELATED_FIELDS
+POST_DETAIL_FIELDS = (
+    'title', 'text', 'pub_date', 'is_published',
+    # For the page's HTTP validators.
+    'updated_at', 'category__updated_at', 'location__updated_at',
+) + POST_IMAGE_FIELDS + POST_RELATED_FIELDS
+POST_FEED_FIELDS = (
+    'title', 'excerpt', 'pub_date', 'updated_at', 'location',
+    'author', 'author__username', 'category', 'category__title',
+)
+COMMENT_FIELDS = (
+    'text', 'created_at', 'post', 'author', 'author__username',
+)
+
+
+class PostQuerySet(models.QuerySet):
+
+    def published(self, at=None):
+        return self.filter(
+            pub_date__lt=at or published_now(),
+            is_published=True,
+            category__is_published=True
+        )
+
+    def visible_to(self, user, at=None):
+        """Published posts plus, for a logged-in user, their own ones."""
+        visible = models.Q(
+            pub_date__lt=at or published_now(),
+            is_published=True,
+            category__is_published=True
+        )
+        if user.is_authenticated:
+            visible |= models.Q(author_id=user.pk)
+        return self.filter(visible)
+
+    def next_release(self, at=None):
+        """Earliest pub_date ``published(at)`` does not reach yet."""
+        return self.filter(
+            pub_date__gte=at or published_now(), is_published=True
+        ).aggregate(release=models.Min('pub_date'))['release']
+
+    def with_comment_count(self):
+        """Card listing: relations shown next to the stored comment_count."""
+        return self.select_related(
+            'author',
+            'location',
+            'category',
+            'image_file',
+        ).only(*POST_CARD_FIELDS).order_by('-pub_date', '-id')
+
+    def for_feed(self):
+        return self.select_related('author', 'category').only(
+            *POST_FEED_FIELDS
+        ).order_by('-pub_date', '-id')
+
+    def for_detail(self):
+        """The post page in one query, with when its comments last changed."""
+        comments_updated_at = Comment.objects.filter(
+            post_id=models.OuterRef('pk')
+        ).order_by().values('post_id').annotate(
+            latest=models.Max('updated_at')
+        ).values('latest')
+        return self.select_related(
+            'author',
+            'location',
+            'category',
+            'image_file',
+        ).only(*POST_DETAIL_FIELDS).annotate(
+            comments_updated_at=models.Subquery(comments_updated_at)
+        )
+
+
 class Post(IsPublishedCreateAtModel):
     title = models.CharField('Заголовок', max_length=const.MAX_LENGTH)
     text = models.TextField('Текст',)
+    excerpt = models.TextField(
+        'Анонс',
+        blank=True,
+        editable=False,
+        help_text='Начало текста для карточек; заполняется при сохранении.'
+    )
     pub_date = models.DateTimeField(
         'Дата и время публикации',
         help_text='Если установить дату и время в будущем — можно '
@@ -82,17 +260,115 @@ class Post(IsPublishedCreateAtModel):
         null=True,
         verbose_name='Категория',
     )
-    image = models.ImageField('Фото', upload_to='post_images', blank=True)
+    image = models.ImageField(
+        'Фото',
+        upload_to='post_images',
+        blank=True,
+        storage=post_image_storage,
+        db_index=True,
+    )
+    image_file = models.ForeignKey(
+        ImageFile,
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Сведения о фото',
+    )
+    comment_count = models.PositiveIntegerField(
+        'Количество комментариев',
+        default=0,
+        editable=False,
+    )
+    visible_since = models.DateTimeField(
+        'Стала видна',
+        null=True,
+        editable=False,
+        help_text='Заполняется воркером publish_scheduled.'
+    )
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         verbose_name = 'публикация'
         verbose_name_plural = 'Публикации'
         default_related_name = 'posts'
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_published_feed_idx',
+            ),
+            models.Index(
+                fields=('category', '-pub_date', '-id'),
+                condition=models.Q(is_published=True),
+                name='post_category_feed_idx',
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_feed_idx',
+            ),
+            models.Index(
+                fields=('pub_date',),
+                condition=models.Q(visible_since__isnull=True),
+                name='post_pending_visibility_idx',
+            ),
+            # MAX(updated_at) of one category's or author's posts.
+            models.Index(
+                fields=('category', 'updated_at'),
+                name='post_category_updated_idx',
+            ),
+            models.Index(
+                fields=('author', 'updated_at'),
+                name='post_author_updated_idx',
+            ),
+        )
 
     def __str__(self):
         return self.title[:const.OBJ_STR_SLICE]
 
+    @staticmethod
+    def make_excerpt(text):
+        return Truncator(text).words(const.EXCERPT_WORDS, truncate=' …')
+
+    def save(self, *args, update_fields=None, **kwargs):
+        # Listings defer text; only recompute the excerpt when it is loaded.
+        if 'text' in self.__dict__:
+            self.excerpt = self.make_excerpt(self.text)
+            if update_fields and 'text' in update_fields:
+                update_fields = {*update_fields, 'excerpt'}
+        if 'image' in self.__dict__:
+            self.store_image()
+        # Rescheduling into the future hands the post back to the worker.
+        if self.pub_date and self.pub_date >= published_now():
+            self.visible_since = None
+        super().save(*args, update_fields=update_fields, **kwargs)
+
+    def store_image(self):
+        """Store a new upload now and record its metadata next to it.
+
+        An upload with the bytes of an already stored image reuses that
+        file instead of writing a copy.
+        """
+        if not self.image:
+            self.image_file = None
+        elif not self.image._committed:
+            metadata = images.read_metadata(self.image)
+            image_file = ImageFile.objects.filter(hash=metadata.hash).first()
+            # collect_orphan_media may have removed the file under its row.
+            if image_file is None or not self.image.storage.exists(
+                image_file.name
+            ):
+                # FileField.pre_save would store it, but we need the name.
+                self.image.save(self.image.name, self.image.file, save=False)
+                image_file, _ = ImageFile.objects.get_or_create(
+                    name=self.image.name, defaults=metadata._asdict()
+                )
+            else:
+                self.image = image_file.name
+            self.image_file = image_file
+
     def get_absolute_url(self):
         return reverse(
             'blog:profile',
@@ -118,9 +394,25 @@ class Comment(CreatedAtModel):
     class Meta(CreatedAtModel.Meta):
         verbose_name = 'комментарий'
         verbose_name_plural = 'Комментарии'
+        indexes = (
+            models.Index(
+                fields=('post', 'created_at'),
+                name='comment_thread_idx',
+            ),
+            models.Index(
+                fields=('post', 'updated_at'),
+                name='comment_post_updated_idx',
+            ),
+        )
 
     def get_absolute_url(self):
         return reverse('blog:post_detail', kwargs={'post_id': self.post_id})
 
+    def save(self, *args, **kwargs):
+        # Post.comment_count is bumped from post_save; keep both in one
+        # transaction.
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     def __str__(self):
         return self.text[:const.OBJ_STR_SLICE]
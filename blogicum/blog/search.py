@@ -0,0 +1,145 @@
+import re
+
+from django.db import connection
+from django.db.models import Q
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from . import const
+from .models import Location, Post
+
+FTS_TABLE = 'blog_post_fts'
+MARK_START, MARK_END = '\x02', '\x03'
+
+
+def is_available():
+    return connection.vendor == 'sqlite'
+
+
+def match_expression(query):
+    """Turn user input into an FTS5 query: every word, as a prefix.
+
+    Quoting each token keeps FTS5 operators and syntax errors out of
+    reach of user input.
+    """
+    words = re.findall(r'\w+', query)[:const.SEARCH_MAX_WORDS]
+    return ' '.join(f'"{word}"*' for word in words)
+
+
+def _reindex(where, params):
+    post, location = Post._meta.db_table, Location._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN '
+            f'(SELECT p.id FROM {post} p WHERE {where})',
+            params
+        )
+        cursor.execute(
+            f'INSERT INTO {FTS_TABLE} (rowid, title, text, location) '
+            f'SELECT p.id, p.title, p.text, COALESCE(l.name, \'\') '
+            f'FROM {post} p LEFT JOIN {location} l ON l.id = p.location_id '
+            f'WHERE {where}',
+            params
+        )
+
+
+def index_posts(post_ids):
+    post_ids = list(post_ids)
+    if not is_available() or not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    _reindex(f'p.id IN ({placeholders})', post_ids)
+
+
+def index_location(location_id):
+    if is_available():
+        _reindex('p.location_id = %s', [location_id])
+
+
+def remove_posts(post_ids):
+    post_ids = list(post_ids)
+    if not is_available() or not post_ids:
+        return
+    placeholders = ', '.join(['%s'] * len(post_ids))
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'DELETE FROM {FTS_TABLE} WHERE rowid IN ({placeholders})',
+            post_ids
+        )
+
+
+def rebuild(batch_size=const.SEARCH_BATCH_SIZE):
+    """Re-create the index from blog_post in pk-ordered batches."""
+    with connection.cursor() as cursor:
+        cursor.execute(f'DELETE FROM {FTS_TABLE}')
+    indexed, last_pk = 0, 0
+    while True:
+        batch = list(
+            Post.objects.filter(pk__gt=last_pk).order_by('pk')
+            .values_list('pk', flat=True)[:batch_size]
+        )
+        if not batch:
+            break
+        index_posts(batch)
+        indexed += len(batch)
+        last_pk = batch[-1]
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')"
+        )
+    return indexed
+
+
+def filter_posts(queryset, query):
+    """Posts of ``queryset`` matching ``query``, unordered."""
+    if not is_available():
+        return queryset.filter(
+            Q(title__icontains=query)
+            | Q(text__icontains=query)
+            | Q(location__name__icontains=query)
+        )
+    match = match_expression(query)
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        where=[
+            f'{Post._meta.db_table}.id IN '
+            f'(SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s)'
+        ],
+        params=[match],
+    )
+
+
+def search_posts(queryset, query):
+    """Posts matching ``query``, best first, with a ``search_snippet``."""
+    if not is_available():
+        return filter_posts(queryset, query).extra(
+            select={'search_snippet': 'excerpt'}
+        )
+    match = match_expression(query)
+    if not match:
+        return queryset.none()
+    return queryset.extra(
+        select={
+            'search_rank': f'{FTS_TABLE}.rank',
+            'search_snippet': (
+                f"snippet({FTS_TABLE}, -1, %s, %s, '…', "
+                f'{const.SEARCH_SNIPPET_TOKENS})'
+            ),
+        },
+        select_params=[MARK_START, MARK_END],
+        tables=[FTS_TABLE],
+        where=[
+            f'{FTS_TABLE}.rowid = {Post._meta.db_table}.id',
+            f'{FTS_TABLE} MATCH %s',
+        ],
+        params=[match],
+    ).order_by('search_rank', '-pub_date')
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(MARK_START, '<mark>')
+        .replace(MARK_END, '</mark>')
+    )
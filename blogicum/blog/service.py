@@ -1,10 +1,174 @@
+import base64
+import binascii
+import json
+
+from django.core.exceptions import ValidationError
 from django.core.paginator import Paginator
+from django.db.models import Q
 
 from . import const
+from .models import COMMENT_FIELDS
+
+
+def encode_cursor(values, backwards=False):
+    payload = json.dumps(
+        {'v': [str(value) for value in values], 'b': backwards},
+        separators=(',', ':')
+    )
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Return ``(values, backwards)`` or ``None`` for a malformed token."""
+    try:
+        payload = json.loads(base64.urlsafe_b64decode(
+            token + '=' * (-len(token) % 4)
+        ))
+        return list(payload['v']), bool(payload['b'])
+    except (binascii.Error, ValueError, TypeError, KeyError):
+        return None
+
+
+class KeysetPage:
+    """Page of a keyset-paginated queryset.
+
+    Mirrors the parts of ``django.core.paginator.Page`` the templates use;
+    ``number`` is ``None`` because keyset pages have no position.
+    """
+
+    number = None
+
+    def __init__(self, object_list, paginator, next_cursor=None,
+                 previous_cursor=None):
+        self.object_list = object_list
+        self.paginator = paginator
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<KeysetPage of {len(self)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
 
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
 
-def paginate(request, posts):
-    paginator = Paginator(posts, const.POSTS_ON_PAGE)
+
+class KeysetPaginator:
+    """Seek pagination over a unique ordering instead of OFFSET + COUNT.
+
+    ``ordering`` must end with a unique field so that every row has a
+    distinct position; tokens carry the ordering values of the boundary row.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-pub_date', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [name.lstrip('-') for name in self.ordering]
+
+    def _keys(self, obj):
+        return [getattr(obj, name) for name in self.fields]
+
+    def _to_python(self, values):
+        opts = self.queryset.model._meta
+        return [
+            opts.get_field(name).to_python(value)
+            for name, value in zip(self.fields, values)
+        ]
+
+    def _seek(self, values, backwards):
+        condition = Q()
+        for position, name in enumerate(self.ordering):
+            descending = name.startswith('-')
+            lookup = 'gt' if descending == backwards else 'lt'
+            step = Q(**{f'{name.lstrip("-")}__{lookup}': values[position]})
+            for prior, value in zip(self.fields[:position], values):
+                step &= Q(**{prior: value})
+            condition |= step
+        return condition
+
+    def _reversed_ordering(self):
+        return [
+            name[1:] if name.startswith('-') else f'-{name}'
+            for name in self.ordering
+        ]
+
+    def _boundary(self, cursor):
+        decoded = decode_cursor(cursor) if cursor else None
+        if decoded is None or len(decoded[0]) != len(self.fields):
+            return None
+        values, backwards = decoded
+        try:
+            return self._to_python(values), backwards
+        except (ValidationError, ValueError):
+            return None
+
+    def get_page(self, cursor=None):
+        """Return the page after (or before) ``cursor``.
+
+        A missing or invalid cursor yields the first page, the same way
+        ``Paginator.get_page`` falls back for a bad page number.
+        """
+        boundary = self._boundary(cursor)
+        backwards = boundary is not None and boundary[1]
+        queryset = self.queryset.order_by(
+            *(self._reversed_ordering() if backwards else self.ordering)
+        )
+        if boundary is not None:
+            queryset = queryset.filter(self._seek(*boundary))
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+        has_next = has_more or backwards
+        has_previous = has_more if backwards else boundary is not None
+        return KeysetPage(
+            rows,
+            self,
+            next_cursor=(
+                encode_cursor(self._keys(rows[-1]))
+                if has_next and rows else None
+            ),
+            previous_cursor=(
+                encode_cursor(self._keys(rows[0]), backwards=True)
+                if has_previous and rows else None
+            ),
+        )
+
+
+def wants_fragment(request):
+    """Script clients ask for the affected fragment instead of a redirect."""
+    return request.headers.get('X-Requested-With') == 'XMLHttpRequest'
+
+
+def paginate(request, posts, per_page=const.POSTS_ON_PAGE):
+    """Paginate ``posts`` by cursor; legacy ``?page=N`` links still work."""
     page_number = request.GET.get('page')
-    page_obj = paginator.get_page(page_number)
-    return page_obj
+    if page_number is not None:
+        return Paginator(posts, per_page).get_page(page_number)
+    return KeysetPaginator(posts, per_page).get_page(
+        request.GET.get(const.CURSOR_PARAM)
+    )
+
+
+def paginate_comments(request, post, per_page=const.COMMENTS_ON_PAGE):
+    """One page of the comment thread, oldest first."""
+    comments = post.comments.select_related('author').only(*COMMENT_FIELDS)
+    return KeysetPaginator(
+        comments, per_page, ordering=('created_at', 'id')
+    ).get_page(request.GET.get(const.CURSOR_PARAM))
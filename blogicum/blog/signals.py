@@ -0,0 +1,202 @@
+from django.db.models import F
+from django.db.models.signals import (
+    post_delete, post_init, post_save, pre_delete
+)
+from django.dispatch import Signal, receiver
+from django.utils.timezone import now
+
+from . import caching, images, search
+from .models import Category, Comment, Location, Post, User
+
+# Sent by the publish_scheduled worker with ``post_ids`` once the scheduled
+# pub_date of those posts has passed and they show up in published().
+post_became_visible = Signal()
+
+# Sent once per set-based UPDATE or DELETE (admin bulk actions) with the
+# ``pks`` of the affected rows, the ``tags`` from ``affected_tags`` taken
+# before the statement and ``deleted``; per-row signals are not sent.
+bulk_changed = Signal()
+
+
+@receiver(post_save, sender=Comment)
+def increment_comment_count(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Post.objects.filter(pk=instance.post_id).update(
+            comment_count=F('comment_count') + 1, updated_at=now()
+        )
+
+
+@receiver(post_delete, sender=Comment)
+def decrement_comment_count(sender, instance, **kwargs):
+    # Fires for cascades and queryset deletes too: the collector sends
+    # post_delete per row whenever a receiver is connected.
+    Post.objects.filter(pk=instance.post_id, comment_count__gt=0).update(
+        comment_count=F('comment_count') - 1, updated_at=now()
+    )
+
+
+def _listing_state(post):
+    # Read from __dict__ so deferred fields are never loaded here.
+    return tuple(
+        post.__dict__.get(name)
+        for name in ('pub_date', 'is_published', 'category_id', 'author_id')
+    )
+
+
+@receiver(post_init, sender=Post)
+def remember_listing_state(sender, instance, **kwargs):
+    instance._listing_state = _listing_state(instance)
+
+
+def _image_name(post):
+    return str(post.__dict__.get('image') or '')
+
+
+@receiver(post_init, sender=Post)
+def remember_image(sender, instance, **kwargs):
+    instance._image_name = _image_name(instance)
+
+
+@receiver(post_save, sender=Post)
+def render_new_image(sender, instance, raw=False, **kwargs):
+    name = _image_name(instance)
+    if name and name != instance._image_name and not raw:
+        images.schedule_renditions(instance.pk, name)
+    instance._image_name = name
+
+
+@receiver(post_save, sender=Post)
+def invalidate_saved_post(sender, instance, created, **kwargs):
+    tags = {caching.instance_tag(instance)}
+    state = _listing_state(instance)
+    if created or state != instance._listing_state:
+        # The post may have entered or left a feed; its old feeds may be
+        # unknown if those fields were deferred, so cover the new ones too.
+        for _, _, category_id, author_id in {instance._listing_state, state}:
+            tags |= caching.listing_tags(category_id, author_id)
+    instance._listing_state = state
+    caching.invalidate(*tags)
+
+
+@receiver(post_delete, sender=Post)
+def invalidate_deleted_post(sender, instance, **kwargs):
+    caching.invalidate(
+        caching.instance_tag(instance),
+        *caching.listing_tags(instance.category_id, instance.author_id)
+    )
+
+
+def _feed_tags(**post_filter):
+    tags = set()
+    for category_id, author_id in Post.objects.filter(
+        **post_filter
+    ).values_list('category_id', 'author_id').distinct():
+        tags |= caching.listing_tags(category_id, author_id)
+    return tags
+
+
+@receiver(post_became_visible)
+def invalidate_released_posts(sender, post_ids, **kwargs):
+    caching.invalidate(*_feed_tags(pk__in=post_ids))
+
+
+def affected_tags(model, pks):
+    """Tags of the pages showing rows ``pks`` of ``model`` right now."""
+    tags = {caching.model_tag(model, pk) for pk in pks}
+    if model is Post:
+        tags |= _feed_tags(pk__in=pks)
+    elif model is Category:
+        tags |= _feed_tags(category__in=pks)
+    return tags
+
+
+@receiver(bulk_changed)
+def invalidate_bulk_change(sender, pks, tags=(), **kwargs):
+    # ``tags`` were taken before the statement, so pages the rows left are
+    # purged along with the ones they show up in now.
+    caching.invalidate(*tags, *affected_tags(sender, pks))
+
+
+@receiver(post_save, sender=Comment)
+@receiver(post_delete, sender=Comment)
+def invalidate_comment_post(sender, instance, **kwargs):
+    caching.invalidate(caching.post_tag(instance.post_id))
+
+
+@receiver(pre_delete, sender=Category)
+@receiver(pre_delete, sender=Location)
+def touch_detached_posts(sender, instance, **kwargs):
+    # The bulk SET NULL that follows changes these posts without touching
+    # updated_at, and their pages without any other trace.
+    instance.posts.update(updated_at=now())
+
+
+@receiver(post_init, sender=Category)
+@receiver(post_init, sender=Location)
+def remember_publication(sender, instance, **kwargs):
+    instance._was_published = instance.__dict__.get('is_published')
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+@receiver(post_save, sender=Location)
+@receiver(post_delete, sender=Location)
+def invalidate_post_relation(sender, instance, **kwargs):
+    tags = {caching.instance_tag(instance)}
+    published = instance.__dict__.get('is_published')
+    if published != instance._was_published:
+        # Posts of a hidden category are on no page carrying its tag, so
+        # the feeds they join have to go too.
+        tags |= _feed_tags(**{sender._meta.model_name: instance.pk})
+    instance._was_published = published
+    caching.invalidate(*tags)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_user(sender, instance, update_fields=None, **kwargs):
+    if update_fields and set(update_fields) == {'last_login'}:
+        return
+    caching.invalidate(
+        caching.instance_tag(instance),
+        caching.author_feed_tag(instance.pk)
+    )
+
+
+SEARCH_FIELDS = {'title', 'text', 'location'}
+
+
+@receiver(post_save, sender=Post)
+def index_saved_post(sender, instance, update_fields=None, **kwargs):
+    if update_fields is None or SEARCH_FIELDS & set(update_fields):
+        search.index_posts([instance.pk])
+
+
+@receiver(post_delete, sender=Post)
+def unindex_deleted_post(sender, instance, **kwargs):
+    search.remove_posts([instance.pk])
+
+
+@receiver(bulk_changed, sender=Post)
+def unindex_bulk_deleted(sender, pks, deleted=False, **kwargs):
+    if deleted:
+        search.remove_posts(pks)
+
+
+@receiver(post_save, sender=Location)
+def index_location_posts(sender, instance, created, **kwargs):
+    if not created:
+        search.index_location(instance.pk)
+
+
+@receiver(pre_delete, sender=Location)
+def remember_location_posts(sender, instance, **kwargs):
+    # Posts are detached with a bulk SET NULL, which sends no signals.
+    instance._post_ids = list(
+        instance.posts.values_list('pk', flat=True)
+    )
+
+
+@receiver(post_delete, sender=Location)
+def index_detached_posts(sender, instance, **kwargs):
+    search.index_posts(getattr(instance, '_post_ids', ()))
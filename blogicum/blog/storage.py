@@ -0,0 +1,129 @@
+import gzip
+import hashlib
+import posixpath
+import re
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+from django.core.files import File
+from django.core.files.base import ContentFile
+from django.core.files.storage import FileSystemStorage, get_storage_class
+
+from . import const
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+_post_image_storage = None
+# Extensions of precompressed variants, tried in order of preference.
+STATIC_ENCODINGS = {'br': '.br', 'gzip': '.gz'}
+# ``ab/ab12….jpg`` and its renditions ``ab/ab12….card.webp``.
+HASHED_NAME = re.compile(r'(?:^|/)([0-9a-f]{2})/\1[0-9a-f]{62}\.[\w.]+$')
+
+
+def file_hash(content):
+    """SHA-256 of a ``File``; leaves it rewound."""
+    digest = hashlib.sha256()
+    for chunk in content.chunks():
+        digest.update(chunk)
+    content.seek(0)
+    return digest.hexdigest()
+
+
+def is_content_addressed(name):
+    """Whether ``name`` was derived from its content and never changes."""
+    return HASHED_NAME.search(name) is not None
+
+
+class ContentAddressedStorage(FileSystemStorage):
+    """Stores files under the hash of their content.
+
+    ``post_images/photo.JPG`` becomes ``post_images/ab/ab12….jpg``: the same
+    bytes always get the same name and are written once, and a stored name
+    never points at different content, so it can be cached forever.
+    """
+
+    def hashed_name(self, name, digest):
+        directory = posixpath.dirname(name)
+        extension = posixpath.splitext(name)[1].lower()
+        return posixpath.join(directory, digest[:2], f'{digest}{extension}')
+
+    def save(self, name, content, max_length=None):
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.hashed_name(name, file_hash(content))
+        if self.exists(name):
+            return name
+        return super().save(name, content, max_length)
+
+    def save_derived(self, name, content):
+        """Store a file computed from a stored one under ``name`` as is."""
+        if self.exists(name):
+            return name
+        return self._save(name, content)
+
+
+def post_image_storage():
+    """Storage of ``Post.image`` and its renditions.
+
+    Must provide ``save_derived`` on top of the ``Storage`` API.
+    """
+    global _post_image_storage
+    if _post_image_storage is None:
+        _post_image_storage = get_storage_class(getattr(
+            settings,
+            'BLOG_IMAGE_STORAGE',
+            'blog.storage.ContentAddressedStorage'
+        ))()
+    return _post_image_storage
+
+
+def _compress(data, encoding):
+    if encoding == 'gzip':
+        return gzip.compress(data, compresslevel=9, mtime=0)
+    return brotli.compress(data, quality=11)
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """Hashed static files with ``.gz`` and ``.br`` siblings.
+
+    The variants are built once by collectstatic, so serving them costs
+    nothing; ``.br`` needs the optional ``brotli`` package. A variant is
+    kept only when it is smaller than the file itself.
+    """
+
+    def encodings(self):
+        return [
+            encoding for encoding in STATIC_ENCODINGS
+            if encoding != 'br' or brotli is not None
+        ]
+
+    def stored_name(self, name):
+        # Files missing from the manifest (no collectstatic yet, or a
+        # template pointing at nothing) keep their name instead of a 500.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        yield from super().post_process(paths, dry_run, **options)
+        if dry_run:
+            return
+        names = set(self.hashed_files) | set(self.hashed_files.values())
+        for name in sorted(names):
+            if posixpath.splitext(name)[1] not in const.STATIC_COMPRESSIBLE:
+                continue
+            with self.open(name) as original:
+                data = original.read()
+            for encoding in self.encodings():
+                compressed = _compress(data, encoding)
+                if len(compressed) >= len(data):
+                    continue
+                variant = name + STATIC_ENCODINGS[encoding]
+                if self.exists(variant):
+                    self.delete(variant)
+                self._save(variant, ContentFile(compressed))
+                yield name, variant, True
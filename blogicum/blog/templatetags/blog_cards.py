@@ -0,0 +1,10 @@
+from django import template
+
+from blog import caching
+
+register = template.Library()
+
+
+@register.simple_tag
+def post_cards(posts):
+    return caching.render_post_cards(posts)
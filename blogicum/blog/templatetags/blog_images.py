@@ -0,0 +1,55 @@
+from django import template
+from django.template.loader import render_to_string
+
+from blog import const, images
+from blog.storage import post_image_storage
+
+register = template.Library()
+
+
+def _srcset(name, width, height, extension):
+    widths = {}
+    for kind in const.RENDITION_WIDTHS:
+        rendition_width = images.rendition_size(width, height, kind)[0]
+        widths.setdefault(rendition_width, post_image_storage().url(
+            images.rendition_name(name, kind, extension)
+        ))
+    return ', '.join(f'{url} {width}w' for width, url in sorted(
+        widths.items()
+    ))
+
+
+@register.simple_tag
+def post_picture(post, kind, css_class='', loading='lazy'):
+    """``<picture>`` of ``post.image`` sized for the ``kind`` rendition.
+
+    Falls back to the original upload while renditions are missing, and
+    to a bare ``<img>`` for images without ``image_file`` metadata.
+    """
+    image = post.image
+    context = {
+        'src': image.url,
+        'css_class': css_class,
+        'loading': loading,
+        'alt': post.title,
+    }
+    metadata = post.image_file if post.image_file_id else None
+    if metadata is not None:
+        width, height = metadata.width, metadata.height
+        context['width'], context['height'] = images.rendition_size(
+            width, height, kind
+        )
+        if images.renditions_ready(post):
+            extension = images.fallback_format(image.name)
+            context.update(
+                src=post_image_storage().url(
+                    images.rendition_name(image.name, kind, extension)
+                ),
+                srcset=_srcset(image.name, width, height, extension),
+                webp_srcset=_srcset(image.name, width, height, images.WEBP),
+                sizes=f'(max-width: {context["width"]}px) 100vw, '
+                      f'{context["width"]}px',
+            )
+        else:
+            context['width'], context['height'] = width, height
+    return render_to_string('includes/picture.html', context)
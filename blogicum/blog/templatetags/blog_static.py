@@ -0,0 +1,29 @@
+from functools import lru_cache
+
+from django import template
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from django.utils.html import format_html
+from django_bootstrap5.templatetags.django_bootstrap5 import bootstrap_css
+
+from blog import const
+
+register = template.Library()
+
+
+@lru_cache(maxsize=None)
+def _self_hosted(name):
+    return finders.find(name) is not None
+
+
+@register.simple_tag
+def bootstrap_stylesheet():
+    """Bootstrap from our static files once ``vendor_bootstrap`` fetched it.
+
+    Until then the CDN link of django_bootstrap5 is rendered.
+    """
+    if not _self_hosted(const.BOOTSTRAP_CSS):
+        return bootstrap_css()
+    return format_html(
+        '<link href="{}" rel="stylesheet">', static(const.BOOTSTRAP_CSS)
+    )
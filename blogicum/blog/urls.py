@@ -1,6 +1,6 @@
 from django.urls import path
 
-from . import views
+from . import api, feeds, views
 
 app_name = 'blog'
 
@@ -8,6 +8,12 @@ urlpatterns = [
     path('',
          views.IndexView.as_view(),
          name='index'),
+    path('feed/',
+         views.index_feed,
+         name='index_feed'),
+    path('atom/',
+         feeds.latest_posts,
+         name='atom'),
     path('posts/create/',
          views.PostCreateView.as_view(),
          name='create_post'),
@@ -20,6 +26,9 @@ urlpatterns = [
     path('posts/<int:post_id>/delete/',
          views.delete_post,
          name='delete_post'),
+    path('posts/<int:post_id>/comments/',
+         views.post_comments,
+         name='post_comments'),
     path('posts/<int:post_id>/comment/',
          views.add_comment,
          name='add_comment'),
@@ -32,10 +41,49 @@ urlpatterns = [
     path('profile/<str:username>/',
          views.profile,
          name='profile'),
+    path('profile/<str:username>/feed/',
+         views.profile_feed,
+         name='profile_feed'),
+    path('profile/<str:username>/atom/',
+         feeds.author_posts,
+         name='profile_atom'),
     path('edit_profile/',
          views.EditProfileView.as_view(),
          name='edit_profile'),
+    path('search/',
+         views.search_posts,
+         name='search'),
     path('category/<slug:category_slug>/',
          views.category_posts,
-         name='category_posts')
+         name='category_posts'),
+    path('category/<slug:category_slug>/feed/',
+         views.category_feed,
+         name='category_feed'),
+    path('category/<slug:category_slug>/atom/',
+         feeds.category_posts,
+         name='category_atom'),
+    path('api/posts/',
+         api.posts,
+         name='api_posts'),
+    path('api/posts/<int:pk>/',
+         api.post,
+         name='api_post'),
+    path('api/comments/',
+         api.comments,
+         name='api_comments'),
+    path('api/comments/<int:pk>/',
+         api.comment,
+         name='api_comment'),
+    path('api/categories/',
+         api.categories,
+         name='api_categories'),
+    path('api/categories/<slug:slug>/',
+         api.category,
+         name='api_category'),
+    path('api/profiles/',
+         api.profiles,
+         name='api_profiles'),
+    path('api/profiles/<str:username>/',
+         api.profile,
+         name='api_profile'),
 ]
@@ -1,12 +1,16 @@
-from django.db.models import Count
+from http import HTTPStatus
+
+from django.http import Http404, HttpResponse, HttpResponseBadRequest
 from django.shortcuts import get_object_or_404, render, redirect
-from django.utils.timezone import now
 from django.views.generic import UpdateView, ListView, CreateView, DeleteView
 from django.contrib.auth import get_user_model
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
 from django.urls import reverse
-from . import service
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import require_safe
+from . import caching, conditional, media, search, service
 
 from .models import Category, Post
 from . import const
@@ -14,67 +18,196 @@ from .forms import CommentForm, PostForm
 from .mixins import CommentMixin, OnlyAuthorMixin
 
 
-def annotate_post(postmanager):
-    return postmanager.select_related(
-        'author',
-        'location',
-        'category',
-    ).annotate(
-        comment_count=Count('comments')
-    ).order_by('-pub_date',)
+def _profile_posts(request, author):
+    posts = author.posts.with_comment_count()
+    if request.user != author:
+        posts = posts.published()
+    return posts
 
 
-def filter_post(queryset):
-    return queryset.filter(
-        pub_date__lt=now(),
-        is_published=True,
-        category__is_published=True
+def _render_feed(request, posts, fragment_url, *tags):
+    page_obj = service.KeysetPaginator(
+        posts, const.POSTS_ON_PAGE
+    ).get_page(request.GET.get(const.CURSOR_PARAM))
+    caching.tag_request(request, *tags, *caching.post_tags(page_obj))
+    response = render(
+        request,
+        'includes/post_feed.html',
+        {'page_obj': page_obj, 'fragment_url': fragment_url}
     )
+    if page_obj.next_cursor:
+        response[const.NEXT_CURSOR_HEADER] = page_obj.next_cursor
+    return response
 
 
+@conditional.conditional_page(conditional.profile_changed_at)
+@caching.anonymous_page_cache
 def profile(request, username):
     author = get_object_or_404(get_user_model(), username=username)
-    posts = annotate_post(author.posts)
-    if request.user != author:
-        posts = filter_post(posts)
-    page_obj = service.paginate(request, posts)
+    page_obj = service.paginate(request, _profile_posts(request, author))
+    caching.tag_request(
+        request,
+        caching.instance_tag(author),
+        caching.author_feed_tag(author.pk),
+        *caching.post_tags(page_obj)
+    )
     return render(
         request,
         'blog/profile.html',
-        {'profile': author, 'page_obj': page_obj}
+        {
+            'profile': author,
+            'page_obj': page_obj,
+            'fragment_url': reverse('blog:profile_feed', args=(username,))
+        }
     )
 
 
+@caching.anonymous_page_cache
+def profile_feed(request, username):
+    author = get_object_or_404(
+        get_user_model().objects.only('pk'), username=username
+    )
+    return _render_feed(
+        request,
+        _profile_posts(request, author),
+        reverse('blog:profile_feed', args=(username,)),
+        caching.instance_tag(author),
+        caching.author_feed_tag(author.pk)
+    )
+
+
+@conditional.conditional_page(conditional.category_changed_at)
+@caching.anonymous_page_cache
 def category_posts(request, category_slug):
     category = get_object_or_404(
         Category,
         slug=category_slug,
         is_published=True
     )
-    posts = filter_post(annotate_post(category.posts))
+    posts = category.posts.published().with_comment_count()
     page_obj = service.paginate(request, posts)
+    caching.tag_request(
+        request,
+        caching.instance_tag(category),
+        caching.category_feed_tag(category.pk),
+        *caching.post_tags(page_obj)
+    )
     return render(
         request,
         'blog/category.html',
-        {'page_obj': page_obj, 'category': category}
+        {
+            'page_obj': page_obj,
+            'category': category,
+            'fragment_url': reverse(
+                'blog:category_feed', args=(category_slug,)
+            )
+        }
+    )
+
+
+@caching.public_page_cache
+def category_feed(request, category_slug):
+    category = get_object_or_404(
+        Category.objects.only('pk'),
+        slug=category_slug,
+        is_published=True
+    )
+    return _render_feed(
+        request,
+        category.posts.published().with_comment_count(),
+        reverse('blog:category_feed', args=(category_slug,)),
+        caching.instance_tag(category),
+        caching.category_feed_tag(category.pk)
+    )
+
+
+@caching.public_page_cache
+def index_feed(request):
+    return _render_feed(
+        request,
+        Post.objects.published().with_comment_count(),
+        reverse('blog:index_feed'),
+        caching.FEED_TAG
     )
 
 
+def search_posts(request):
+    query = request.GET.get(const.SEARCH_PARAM, '').strip()
+    page_obj = None
+    if query:
+        posts = search.search_posts(
+            Post.objects.published().with_comment_count(), query
+        )
+        page_obj = Paginator(posts, const.POSTS_ON_PAGE).get_page(
+            request.GET.get('page')
+        )
+        for post in page_obj:
+            post.snippet = search.highlight(post.search_snippet)
+    return render(
+        request,
+        'blog/search.html',
+        {'query': query, 'page_obj': page_obj}
+    )
+
+
+@require_safe
+def serve_media(request, name):
+    access = media.visibility(request, name)
+    if access is None:
+        raise Http404
+    return media.serve(request, name, access)
+
+
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
-    if request.user != post.author:
-        post = get_object_or_404(filter_post(Post.objects), pk=post_id)
+    # The validators come from the same row, so a 304 costs one query.
+    post = get_object_or_404(
+        Post.objects.visible_to(request.user).for_detail(), pk=post_id
+    )
+    return conditional.respond(
+        request,
+        conditional.post_changed_at(post),
+        lambda: _post_page(request, post)
+    )
+
+
+@caching.anonymous_page_cache
+def _post_page(request, post):
+    comments = service.paginate_comments(request, post)
+    caching.tag_request(
+        request,
+        *caching.post_tags([post]),
+        *(caching.user_tag(comment.author_id) for comment in comments)
+    )
     return render(
         request,
         'blog/detail.html',
         {
             'post': post,
             'form': CommentForm(),
-            'comments': post.comments.select_related('author')
+            'comments': comments
         }
     )
 
 
+@caching.anonymous_page_cache
+def post_comments(request, post_id):
+    post = get_object_or_404(
+        Post.objects.visible_to(request.user).only('pk', 'author'),
+        pk=post_id
+    )
+    comments = service.paginate_comments(request, post)
+    caching.tag_request(
+        request,
+        caching.post_tag(post.pk),
+        *(caching.user_tag(comment.author_id) for comment in comments)
+    )
+    return render(
+        request,
+        'includes/comment_list.html',
+        {'post': post, 'comments': comments}
+    )
+
+
 @login_required
 def add_comment(request, post_id):
     post = get_object_or_404(Post, pk=post_id)
@@ -84,6 +217,15 @@ def add_comment(request, post_id):
         comment.author = request.user
         comment.post = post
         comment.save()
+        if service.wants_fragment(request):
+            return render(
+                request,
+                'includes/comment.html',
+                {'comment': comment},
+                status=HTTPStatus.CREATED
+            )
+    elif service.wants_fragment(request):
+        return HttpResponseBadRequest(form.errors.as_ul())
     return redirect('blog:post_detail', post_id=post_id)
 
 
@@ -99,7 +241,12 @@ def delete_post(request, post_id):
 
 
 class DeleteCommentView(CommentMixin, OnlyAuthorMixin, DeleteView):
-    pass
+
+    def delete(self, request, *args, **kwargs):
+        if not service.wants_fragment(request):
+            return super().delete(request, *args, **kwargs)
+        self.get_object().delete()
+        return HttpResponse(status=HTTPStatus.NO_CONTENT)
 
 
 class EditPostView(OnlyAuthorMixin, UpdateView):
@@ -128,7 +275,19 @@ class PostCreateView(LoginRequiredMixin, CreateView):
 
 
 class EditCommentView(CommentMixin, OnlyAuthorMixin, UpdateView):
-    pass
+
+    def form_valid(self, form):
+        if not service.wants_fragment(self.request):
+            return super().form_valid(form)
+        self.object = form.save()
+        return render(
+            self.request, 'includes/comment.html', {'comment': self.object}
+        )
+
+    def form_invalid(self, form):
+        if not service.wants_fragment(self.request):
+            return super().form_invalid(form)
+        return HttpResponseBadRequest(form.errors.as_ul())
 
 
 class EditProfileView(LoginRequiredMixin, UpdateView):
@@ -144,8 +303,27 @@ class EditProfileView(LoginRequiredMixin, UpdateView):
                        kwargs={"username": self.object.username})
 
 
+@method_decorator(
+    conditional.conditional_page(conditional.index_changed_at),
+    name='dispatch'
+)
+@method_decorator(caching.anonymous_page_cache, name='dispatch')
 class IndexView(ListView):
     template_name = 'blog/index.html'
     model = Post
-    queryset = filter_post(annotate_post(Post.objects))
     paginate_by = const.POSTS_ON_PAGE
+
+    def get_queryset(self):
+        return Post.objects.published().with_comment_count()
+
+    def get_context_data(self, **kwargs):
+        return super().get_context_data(
+            fragment_url=reverse('blog:index_feed'), **kwargs
+        )
+
+    def paginate_queryset(self, queryset, page_size):
+        page = service.paginate(self.request, queryset, page_size)
+        caching.tag_request(
+            self.request, caching.FEED_TAG, *caching.post_tags(page)
+        )
+        return page.paginator, page, page.object_list, page.has_other_pages()
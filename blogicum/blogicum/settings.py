@@ -28,6 +28,7 @@ INSTALLED_APPS = [
 
 MIDDLEWARE = [
     'django.middleware.security.SecurityMiddleware',
+    'blog.middleware.StaticFilesMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
@@ -74,6 +75,18 @@ DATABASES = {
     }
 }
 
+# Page caches are purged from signal receivers in whichever process saves
+# the data, including management commands such as publish_scheduled. In
+# production every process must share one backend (Redis, Memcached or
+# the database cache); LocMemCache only suits a single development server.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }
+}
+
+BLOG_PAGE_CACHE_TIMEOUT = 60 * 15
+
 AUTH_PASSWORD_VALIDATORS = [
     {
         'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
@@ -101,10 +114,28 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+STATIC_ROOT = BASE_DIR / 'static'
+
+STATICFILES_STORAGE = 'blog.storage.CompressedManifestStaticFilesStorage'
+
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 
+MEDIA_URL = '/media/'
+
 MEDIA_ROOT = BASE_DIR / 'media'
 
+# Let the front server send media files after serve_media has checked
+# access: 'x-accel-redirect' (nginx, an internal location mapped to
+# BLOG_MEDIA_ACCEL_PREFIX) or 'x-sendfile' (Apache, lighttpd). Without it
+# files are streamed by the application server.
+BLOG_MEDIA_OFFLOAD = None
+
+BLOG_MEDIA_ACCEL_PREFIX = '/protected-media/'
+
+BLOG_RENDITION_WORKERS = 2
+
+BLOG_PUBLISHED_BUCKET_SECONDS = 60
+
 LOGIN_REDIRECT_URL = 'blog:index'
 
 CSRF_FAILURE_VIEW = 'pages.views.csrf_failure'
@@ -1,7 +1,8 @@
 from django.contrib import admin
 from django.urls import include, path
 from django.conf import settings
-from django.conf.urls.static import static
+
+from blog.views import serve_media
 
 
 urlpatterns = [
@@ -13,6 +14,9 @@ urlpatterns = [
          include('accounts.urls')),
     path('auth/',
          include('django.contrib.auth.urls')),
+    path(f'{settings.MEDIA_URL.lstrip("/")}<path:name>',
+         serve_media,
+         name='media'),
     path('',
          include('blog.urls')),
 ]
@@ -21,8 +25,6 @@ if settings.DEBUG:
     import debug_toolbar
     urlpatterns += (path('__debug__/', include(debug_toolbar.urls)),)
 
-urlpatterns += static(settings.MEDIA_URL, document_root=settings.MEDIA_ROOT)
-
 handler404 = 'pages.views.page_not_found'
 
 handler500 = 'pages.views.server_error'
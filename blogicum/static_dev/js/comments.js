@@ -0,0 +1,43 @@
+// Posts the comment form in the background and inserts the returned
+// comment fragment instead of reloading the whole post page.
+document.addEventListener('submit', function (event) {
+  var form = event.target.closest('form[data-comment-form]');
+  var list = document.querySelector('[data-comment-list]');
+  if (!form || !list || !window.fetch) {
+    return;
+  }
+  var status = form.querySelector('[data-comment-status]');
+  event.preventDefault();
+  status.textContent = '';
+  fetch(form.action, {
+    method: 'POST',
+    body: new FormData(form),
+    headers: {'X-Requested-With': 'XMLHttpRequest'},
+    credentials: 'same-origin'
+  })
+    .then(function (response) {
+      return response.text().then(function (html) {
+        if (response.status === 400) {
+          // The form errors, rendered by the server.
+          status.innerHTML = html;
+          return;
+        }
+        if (!response.ok) {
+          status.textContent = 'Не удалось отправить комментарий.';
+          return;
+        }
+        form.reset();
+        if (list.querySelector('a[data-load-more]')) {
+          // New comments go last; this one shows up with the last page.
+          status.textContent = 'Комментарий добавлен в конец обсуждения.';
+        } else {
+          list.insertAdjacentHTML('beforeend', html);
+        }
+      });
+    })
+    .catch(function () {
+      // The server may have saved the comment already; never resend it.
+      status.textContent = 'Нет связи с сервером. Проверьте, появился ли ' +
+        'комментарий, прежде чем отправлять его снова.';
+    });
+});
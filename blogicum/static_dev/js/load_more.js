@@ -0,0 +1,24 @@
+// Replaces a `data-load-more` link with the fragment it points to (the
+// attribute value, or the link itself when it is empty); the fragment ends
+// with the link to the next batch, if there is one.
+document.addEventListener('click', function (event) {
+  var link = event.target.closest('a[data-load-more]');
+  if (!link) {
+    return;
+  }
+  event.preventDefault();
+  link.classList.add('disabled');
+  fetch(link.dataset.loadMore || link.href, {headers: {'X-Requested-With': 'XMLHttpRequest'}})
+    .then(function (response) {
+      if (!response.ok) {
+        throw new Error(response.statusText);
+      }
+      return response.text();
+    })
+    .then(function (html) {
+      link.outerHTML = html;
+    })
+    .catch(function () {
+      link.classList.remove('disabled');
+    });
+});
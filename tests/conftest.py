@@ -19,6 +19,7 @@ from typing import (
 import pytest
 from django.apps import apps
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.db.models import Model, Field
 from django.forms import BaseForm
 from django.http import HttpResponse
@@ -41,6 +42,21 @@ def enable_debug_false():
         yield
 
 
+@pytest.fixture(autouse=True)
+def clear_cache():
+    # Test databases are rolled back and primary keys reused, so pages
+    # cached by one test must not leak into the next.
+    cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def inline_renditions(settings, tmp_path):
+    # No process pool in tests; renditions go to a throwaway MEDIA_ROOT.
+    settings.BLOG_RENDITION_WORKERS = 0
+    settings.MEDIA_ROOT = tmp_path
+
+
 class SafeImportFromContextManager:
     def __init__(
             self,
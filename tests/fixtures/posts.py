@@ -1,3 +1,4 @@
+import mimetypes
 from datetime import timedelta
 from io import BytesIO
 from typing import Tuple
@@ -5,6 +6,7 @@ from typing import Tuple
 import pytest
 from PIL import Image
 from django.core.files.images import ImageFile
+from django.core.files.uploadedfile import SimpleUploadedFile
 from django.db.models import Model
 from django.forms import BaseForm
 from django.test import Client
@@ -79,6 +81,44 @@ def post_of_another_author(
     )
 
 
+def image_bytes(size=(64, 48), color=(73, 109, 137), format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, color=color).save(buffer, format)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def make_post(mixer: Mixer, user, published_category):
+    """Factory of published posts; ``fields`` override the defaults."""
+    def make(**fields):
+        fields.setdefault('author', user)
+        fields.setdefault('category', published_category)
+        fields.setdefault('location', None)
+        fields.setdefault('is_published', True)
+        fields.setdefault('pub_date', timezone.now() - timedelta(days=1))
+        return mixer.blend('blog.Post', **fields)
+    return make
+
+
+@pytest.fixture
+def make_post_with_image(make_post):
+    """Factory of published posts with an uploaded image.
+
+    ``content`` defaults to ``image_bytes()``; ``fields`` go to
+    ``make_post``.
+    """
+    def make(content=None, name='photo.jpg', **fields):
+        if content is None:
+            content = image_bytes()
+        return make_post(
+            image=SimpleUploadedFile(
+                name, content, mimetypes.guess_type(name)[0]
+            ),
+            **fields
+        )
+    return make
+
+
 @pytest.fixture
 def post_with_published_location(
         mixer: Mixer, user, published_location, published_category):
@@ -0,0 +1,183 @@
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from blog import admin as blog_admin
+from blog.models import Category, Comment, Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def comments(mixer, user, another_user, post_with_published_location):
+    post = post_with_published_location
+    return (
+        mixer.cycle(5).blend(
+            'blog.Comment', post=post, author=user, text='длинный ' * 20
+        )
+        + mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    )
+
+
+def test_comment_changelist_is_flat(
+        admin_client, comments, django_assert_max_num_queries
+):
+    # Session, user, one page of rows; the count query may be estimated.
+    with django_assert_max_num_queries(6):
+        response = admin_client.get('/admin/blog/comment/')
+    assert response.status_code == 200
+    content = response.content.decode()
+    assert 'длинный ' * 20 not in content, (
+        'Убедитесь, что список комментариев в админке показывает '
+        'сокращённый текст.'
+    )
+
+
+def test_comment_changelist_filters_by_typed_values(
+        admin_client, comments, another_user, post_with_published_location
+):
+    response = admin_client.get(
+        '/admin/blog/comment/', {'author': another_user.username}
+    )
+    authors = {
+        comment.author_id for comment in response.context['cl'].result_list
+    }
+    assert authors == {another_user.id}
+    response = admin_client.get(
+        '/admin/blog/comment/', {'post': post_with_published_location.id}
+    )
+    assert len(response.context['cl'].result_list) == len(comments)
+    response = admin_client.get('/admin/blog/comment/', {'post': 'abc'})
+    assert response.status_code == 200
+
+
+def test_post_changelist_query_count_does_not_grow(
+        admin_client, many_posts_with_published_locations,
+        django_assert_max_num_queries
+):
+    with django_assert_max_num_queries(8):
+        response = admin_client.get('/admin/blog/post/')
+    assert response.status_code == 200
+
+
+def test_estimated_count_is_used_for_unfiltered_lists(monkeypatch):
+    monkeypatch.setattr(
+        blog_admin, 'estimated_row_count', lambda model: 10 ** 6
+    )
+    paginator = blog_admin.EstimatedCountPaginator(
+        Comment.objects.all(), 100
+    )
+    assert paginator.count == 10 ** 6
+    paginator = blog_admin.EstimatedCountPaginator(
+        Comment.objects.filter(post_id=1), 100
+    )
+    assert paginator.count == 0
+
+
+@pytest.mark.skipif(
+    connection.vendor != 'sqlite', reason='sqlite_stat1 is SQLite only'
+)
+def test_row_estimate_ignores_partial_indexes(mixer, user):
+    for count, is_published in ((8, False), (2, True)):
+        mixer.cycle(count).blend(
+            'blog.Post', author=user, is_published=is_published
+        )
+    table = Post._meta.db_table
+    with connection.cursor() as cursor:
+        cursor.execute('ANALYZE')
+        # Put the partial indexes, which count published rows only, first.
+        cursor.execute(
+            'SELECT idx, stat FROM sqlite_stat1 WHERE tbl = %s', [table]
+        )
+        stats = sorted(
+            cursor.fetchall(), key=lambda row: int(row[1].split()[0])
+        )
+        cursor.execute('DELETE FROM sqlite_stat1 WHERE tbl = %s', [table])
+        cursor.executemany(
+            'INSERT INTO sqlite_stat1 (tbl, idx, stat) VALUES (%s, %s, %s)',
+            [(table, *row) for row in stats]
+        )
+    assert blog_admin.estimated_row_count(Post) == 10, (
+        'Убедитесь, что оценка числа строк берётся не из частичного индекса.'
+    )
+
+
+def _run_action(client, model, action, objects, **extra):
+    return client.post(f'/admin/blog/{model}/', {
+        'action': action,
+        '_selected_action': [obj.pk for obj in objects],
+        **extra,
+    }, follow=True)
+
+
+def test_unpublish_action_is_one_update_and_one_invalidation(
+        admin_client, many_posts_with_published_locations, monkeypatch
+):
+    posts = many_posts_with_published_locations
+    invalidations = []
+    monkeypatch.setattr(
+        blog_admin.signals.caching, 'invalidate',
+        lambda *tags: invalidations.append(set(tags))
+    )
+    with CaptureQueriesContext(connection) as ctx:
+        response = _run_action(admin_client, 'post', 'unpublish', posts)
+    updates = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('UPDATE "blog_post"')
+    ]
+    assert len(updates) == 1, (
+        'Убедитесь, что массовое снятие с публикации — один UPDATE.'
+    )
+    assert len(invalidations) == 1
+    assert 'feed' in invalidations[0]
+    assert f'Снято с публикации записей: {len(posts)}.' in (
+        response.content.decode()
+    )
+    assert not Post.objects.filter(is_published=True).exists()
+
+
+def test_move_to_category_action(
+        admin_client, post_with_published_location, mixer
+):
+    target = mixer.blend('blog.Category', is_published=True)
+    _run_action(
+        admin_client, 'post', 'move_to_category',
+        [post_with_published_location], category=target.pk
+    )
+    post_with_published_location.refresh_from_db()
+    assert post_with_published_location.category_id == target.pk
+
+
+def test_delete_posts_with_comments_skips_per_row_signals(
+        admin_client, comments, post_with_published_location
+):
+    post = post_with_published_location
+    # Confirmation page first, then the delete itself.
+    _run_action(admin_client, 'post', 'delete_selected', [post])
+    with CaptureQueriesContext(connection) as ctx:
+        response = _run_action(
+            admin_client, 'post', 'delete_selected', [post], post='yes'
+        )
+    deletes = [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('DELETE FROM "blog_')
+    ]
+    assert len(deletes) == 2, (
+        'Убедитесь, что публикации удаляются вместе с комментариями '
+        'двумя запросами DELETE.'
+    )
+    assert not Post.objects.filter(pk=post.pk).exists()
+    assert not Comment.objects.exists()
+    assert f'удалено комментариев: {len(comments)}' in (
+        response.content.decode()
+    )
+
+
+def test_category_publish_action(admin_client, mixer):
+    categories = mixer.cycle(3).blend('blog.Category', is_published=False)
+    _run_action(admin_client, 'category', 'publish', categories)
+    assert all(
+        category.is_published
+        for category in Category.objects.filter(
+            pk__in=[category.pk for category in categories]
+        )
+    )
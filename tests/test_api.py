@@ -0,0 +1,161 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _results(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'application/json'
+    return response.json()['results']
+
+
+def test_posts_follow_cursors(client, make_post):
+    posts = [
+        make_post(pub_date=timezone.now() - timedelta(hours=hours))
+        for hours in range(1, 16)
+    ]
+    seen, url = [], '/api/posts/'
+    while url:
+        response = client.get(url)
+        data = response.json()
+        seen.extend(post['id'] for post in _results(response))
+        assert response.get('X-Next-Cursor') == data['next']
+        url = f'/api/posts/?cursor={data["next"]}' if data['next'] else None
+    assert seen == [post.id for post in posts], (
+        'Убедитесь, что курсоры API проходят ленту без пропусков и повторов.'
+    )
+
+
+def test_posts_follow_html_visibility(
+        client, user_client, user, make_post, future_posts,
+        posts_with_unpublished_category
+):
+    post = make_post()
+    draft = make_post(is_published=False)
+    ids = {item['id'] for item in _results(client.get('/api/posts/'))}
+    assert ids == {post.id}, (
+        'Убедитесь, что API показывает только опубликованные посты.'
+    )
+    own = _results(user_client.get(f'/api/posts/?author={user.username}'))
+    assert {post.id, draft.id} <= {item['id'] for item in own}, (
+        'Убедитесь, что автор видит в API свои неопубликованные посты.'
+    )
+    assert client.get(
+        f'/api/posts/{draft.id}/'
+    ).status_code == HTTPStatus.NOT_FOUND
+    assert user_client.get(
+        f'/api/posts/{draft.id}/'
+    ).status_code == HTTPStatus.OK
+
+
+def test_fields_limit_columns_and_output(client, make_post):
+    post = make_post()
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get('/api/posts/?fields=title,author')
+    assert _results(response) == [
+        {'id': post.id, 'title': post.title, 'author': post.author.username}
+    ], 'Убедитесь, что параметр fields выбирает поля ответа.'
+    sql = queries[-1]['sql']
+    assert '"text"' not in sql and '"excerpt"' not in sql, (
+        'Убедитесь, что в запрос попадают только запрошенные колонки.'
+    )
+    # A cold cache also looks up when the next scheduled post goes live.
+    assert len(queries) == 2
+    assert b'": ' not in response.content, 'Ответ должен быть компактным.'
+    with CaptureQueriesContext(connection) as queries:
+        client.get('/api/posts/?fields=title')
+    assert len(queries) == 1, (
+        'Убедитесь, что список постов загружается одним запросом.'
+    )
+
+    response = client.get('/api/posts/?fields=title,password')
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert 'password' in response.json()['error']
+
+
+def test_batch_lookup_keeps_order(client, make_post):
+    first, second = make_post(), make_post()
+    hidden = make_post(is_published=False)
+    response = client.get(
+        f'/api/posts/?ids={second.id},{hidden.id},{first.id}&fields=title'
+    )
+    assert [item['id'] for item in _results(response)] == [
+        second.id, first.id
+    ], 'Убедитесь, что пакетный запрос возвращает видимые объекты по порядку.'
+    assert client.get('/api/posts/?ids=1,x').status_code == (
+        HTTPStatus.BAD_REQUEST
+    )
+    too_many = ','.join(str(pk) for pk in range(1, 102))
+    assert client.get(f'/api/posts/?ids={too_many}').status_code == (
+        HTTPStatus.BAD_REQUEST
+    )
+
+
+def test_category_filter(client, mixer, make_post, published_category):
+    post = make_post()
+    other = mixer.blend('blog.Category', is_published=True)
+    make_post(category=other)
+    items = _results(
+        client.get(f'/api/posts/?category={published_category.slug}')
+    )
+    assert [item['id'] for item in items] == [post.id]
+    assert items[0]['category'] == published_category.slug
+    other.is_published = False
+    other.save()
+    assert client.get(
+        f'/api/posts/?category={other.slug}'
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_comments(client, mixer, make_post):
+    post = make_post()
+    hidden = make_post(is_published=False)
+    comments = [mixer.blend('blog.Comment', post=post) for _ in range(3)]
+    hidden_comment = mixer.blend('blog.Comment', post=hidden)
+    items = _results(client.get(f'/api/comments/?post={post.id}'))
+    assert [item['id'] for item in items] == [
+        comment.id for comment in comments
+    ]
+    assert items[0]['author'] == comments[0].author.username
+    assert client.get(
+        f'/api/comments/?post={hidden.id}'
+    ).status_code == HTTPStatus.NOT_FOUND
+    batch = _results(client.get(
+        f'/api/comments/?ids={hidden_comment.id},{comments[1].id}'
+    ))
+    assert [item['id'] for item in batch] == [comments[1].id], (
+        'Убедитесь, что комментарии к скрытым постам недоступны.'
+    )
+    assert client.get('/api/comments/').status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_categories_and_profiles(client, mixer, user, published_category):
+    hidden = mixer.blend('blog.Category', is_published=False)
+    slugs = {item['slug'] for item in _results(client.get('/api/categories/'))}
+    assert published_category.slug in slugs and hidden.slug not in slugs
+    assert client.get(
+        f'/api/categories/{hidden.slug}/'
+    ).status_code == HTTPStatus.NOT_FOUND
+    response = client.get(f'/api/profiles/{user.username}/')
+    assert response.json() == {
+        'id': user.id,
+        'username': user.username,
+        'first_name': user.first_name,
+        'last_name': user.last_name,
+    }, 'Убедитесь, что профиль не раскрывает лишних полей.'
+
+
+def test_cached_until_the_post_changes(client, make_post):
+    post = make_post()
+    url = f'/api/posts/{post.id}/?fields=title'
+    client.get(url)
+    assert client.get(url)['X-Page-Cache'] == 'hit'
+    post.title = 'Новый заголовок'
+    post.save()
+    assert client.get(url).json()['title'] == post.title
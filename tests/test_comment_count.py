@@ -0,0 +1,46 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _count(post):
+    post.refresh_from_db(fields=['comment_count'])
+    return post.comment_count
+
+
+def test_counter_follows_comments(
+        mixer, user, another_user, post_with_published_location
+):
+    post = post_with_published_location
+    own = mixer.cycle(2).blend('blog.Comment', post=post, author=user)
+    mixer.cycle(3).blend('blog.Comment', post=post, author=another_user)
+    assert _count(post) == 5, (
+        'Убедитесь, что счётчик комментариев увеличивается при их создании.'
+    )
+
+    own[0].delete()
+    assert _count(post) == 4
+
+    post.comments.filter(pk=own[1].pk).delete()
+    assert _count(post) == 3, (
+        'Убедитесь, что счётчик уменьшается при удалении комментариев'
+        ' через QuerySet.delete().'
+    )
+
+    another_user.delete()
+    assert _count(post) == 0, (
+        'Убедитесь, что счётчик уменьшается при каскадном удалении.'
+    )
+
+
+def test_recount_command_repairs_drift(
+        mixer, post_with_published_location
+):
+    post = post_with_published_location
+    mixer.cycle(2).blend('blog.Comment', post=post)
+    type(post).objects.filter(pk=post.pk).update(comment_count=7)
+
+    call_command('recount_comments', batch_size=1)
+
+    assert _count(post) == 2
@@ -0,0 +1,55 @@
+from http import HTTPStatus
+
+import pytest
+
+pytestmark = [pytest.mark.django_db]
+
+XHR = {'HTTP_X_REQUESTED_WITH': 'XMLHttpRequest'}
+
+
+def test_add_comment_returns_fragment(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Фрагментный ответ'}, **XHR
+    )
+    assert response.status_code == HTTPStatus.CREATED
+    content = response.content.decode()
+    assert 'Фрагментный ответ' in content
+    assert '<html' not in content, (
+        'Убедитесь, что в режиме фрагмента возвращается только комментарий.'
+    )
+    assert post.comments.count() == 1
+
+    invalid = user_client.post(f'/posts/{post.id}/comment/', {}, **XHR)
+    assert invalid.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_redirect_flow_is_kept(user_client, post_with_published_location):
+    post = post_with_published_location
+    response = user_client.post(
+        f'/posts/{post.id}/comment/', {'text': 'Обычная форма'}
+    )
+    assert response.status_code == HTTPStatus.FOUND
+    assert response.url == f'/posts/{post.id}/'
+
+
+def test_edit_and_delete_comment_fragments(
+        user_client, mixer, user, post_with_published_location
+):
+    post = post_with_published_location
+    comment = mixer.blend('blog.Comment', post=post, author=user)
+    base = f'/posts/{post.id}'
+
+    edited = user_client.post(
+        f'{base}/edit_comment/{comment.id}/', {'text': 'Исправлено'}, **XHR
+    )
+    assert edited.status_code == HTTPStatus.OK
+    assert 'Исправлено' in edited.content.decode()
+
+    deleted = user_client.post(
+        f'{base}/delete_comment/{comment.id}/', **XHR
+    )
+    assert deleted.status_code == HTTPStatus.NO_CONTENT
+    assert not post.comments.exists()
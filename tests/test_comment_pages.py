@@ -0,0 +1,43 @@
+import re
+
+import pytest
+
+from blog import const
+
+pytestmark = [pytest.mark.django_db]
+
+
+def test_comment_thread_is_paginated(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    comments = mixer.cycle(const.COMMENTS_ON_PAGE + 5).blend(
+        'blog.Comment', post=post
+    )
+    response = client.get(f'/posts/{post.id}/')
+    first_page = response.context['comments']
+    assert [c.id for c in first_page] == [
+        c.id for c in comments[:const.COMMENTS_ON_PAGE]
+    ], 'Убедитесь, что на странице поста выводится первая страница ветки.'
+
+    more_url = re.search(
+        r'href="(/posts/\d+/comments/\?cursor=[^"]+)"',
+        response.content.decode()
+    ).group(1)
+    fragment = client.get(more_url)
+    assert fragment.status_code == 200
+    assert '<html' not in fragment.content.decode()
+    assert [c.id for c in fragment.context['comments']] == [
+        c.id for c in comments[const.COMMENTS_ON_PAGE:]
+    ]
+    assert not fragment.context['comments'].has_next()
+
+
+def test_comment_fragment_respects_visibility(
+        another_user_client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = another_user_client.get(f'/posts/{post.id}/comments/')
+    assert response.status_code == 404
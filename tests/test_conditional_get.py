@@ -0,0 +1,164 @@
+from http import HTTPStatus
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from blog.admin import bulk_update
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _revalidate(client, url):
+    etag = client.get(url)['ETag']
+    return client.get(url, HTTP_IF_NONE_MATCH=etag), etag
+
+
+@pytest.mark.parametrize('url', [
+    '/',
+    '/category/{post.category.slug}/',
+    '/profile/{post.author.username}/',
+    '/posts/{post.id}/',
+])
+def test_unchanged_pages_are_not_rendered(
+        client, post_with_published_location, url
+):
+    url = url.format(post=post_with_published_location)
+    first = client.get(url)
+    assert first.status_code == HTTPStatus.OK
+    assert first.has_header('ETag') and first.has_header('Last-Modified'), (
+        'Убедитесь, что страницы блога отдают ETag и Last-Modified.'
+    )
+    assert 'no-cache' in first['Cache-Control']
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении ETag страница не отправляется заново.'
+    )
+    assert not response.templates
+    assert len(queries) <= 6
+    response = client.get(
+        url, HTTP_IF_MODIFIED_SINCE=first['Last-Modified']
+    )
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_edited_post_changes_validators(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    urls = ('/', f'/posts/{post.id}/')
+    etags = [client.get(url)['ETag'] for url in urls]
+    post.title = 'Новый заголовок'
+    post.save(update_fields=['title'])
+    for url, etag in zip(urls, etags):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+        assert response.status_code == HTTPStatus.OK, (
+            'Убедитесь, что изменение поста меняет ETag его страниц.'
+        )
+        assert response['ETag'] != etag
+
+
+def test_new_comment_changes_post_validators(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    response, etag = _revalidate(client, '/')
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    _, detail_etag = _revalidate(client, f'/posts/{post.id}/')
+    mixer.blend('blog.Comment', post=post)
+    assert client.get(
+        '/', HTTP_IF_NONE_MATCH=etag
+    ).status_code == HTTPStatus.OK, (
+        'Убедитесь, что новый комментарий меняет ETag ленты: '
+        'в карточке показано число комментариев.'
+    )
+    assert client.get(
+        f'/posts/{post.id}/', HTTP_IF_NONE_MATCH=detail_etag
+    ).status_code == HTTPStatus.OK
+
+
+def test_deleted_post_changes_feed_validators(
+        client, post_with_published_location
+):
+    _, etag = _revalidate(client, '/')
+    post_with_published_location.delete()
+    assert client.get('/', HTTP_IF_NONE_MATCH=etag).status_code == (
+        HTTPStatus.OK
+    )
+
+
+def test_validators_differ_per_viewer(
+        client, user_client, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    response = user_client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'private' in response['Cache-Control']
+
+
+def test_hidden_post_has_no_validators(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    post.is_published = False
+    post.save()
+    response = client.get(f'/posts/{post.id}/', HTTP_IF_NONE_MATCH='"x"')
+    assert response.status_code == HTTPStatus.NOT_FOUND
+
+
+def test_updates_touch_updated_at(post_with_published_location):
+    post = post_with_published_location
+    updated_at = post.updated_at
+    post.save(update_fields=['title'])
+    post.refresh_from_db()
+    assert post.updated_at > updated_at, (
+        'Убедитесь, что `save(update_fields=...)` обновляет `updated_at`.'
+    )
+    updated_at = post.updated_at
+    bulk_update(Post.objects.filter(pk=post.pk), is_published=False)
+    post.refresh_from_db()
+    assert post.updated_at > updated_at
+
+
+def test_text_update_writes_the_excerpt(post_with_published_location):
+    post = post_with_published_location
+    post.text = 'Новый текст публикации'
+    post.save(update_fields=['text'])
+    post.refresh_from_db()
+    assert post.excerpt == 'Новый текст публикации', (
+        "Убедитесь, что `save(update_fields=['text'])` обновляет анонс."
+    )
+
+
+def test_new_validators_never_carry_a_cached_body(
+        client, post_with_published_location
+):
+    post = post_with_published_location
+    url = f'/posts/{post.id}/'
+    client.get(url)
+    etag = client.get(url)['ETag']
+    # A write whose invalidation never reached this process's cache.
+    Post.objects.filter(pk=post.pk).update(
+        title='Новый заголовок', updated_at=timezone.now()
+    )
+    response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert response['ETag'] != etag
+    assert 'Новый заголовок' in response.content.decode(), (
+        'Убедитесь, что под новым ETag не отдаётся страница из кеша, '
+        'собранная для прежнего.'
+    )
+
+
+def test_post_detail_answers_304_in_one_query(
+        client, django_assert_num_queries, post_with_published_location
+):
+    url = f'/posts/{post_with_published_location.id}/'
+    etag = client.get(url)['ETag']
+    with django_assert_num_queries(1):
+        response = client.get(url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
@@ -0,0 +1,109 @@
+from http import HTTPStatus
+from xml.etree import ElementTree
+
+import pytest
+from django.utils import timezone
+
+from blog.models import Post
+
+pytestmark = [pytest.mark.django_db]
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+def _titles(response):
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'].startswith('application/atom+xml'), (
+        'Убедитесь, что лента отдаётся в формате Atom.'
+    )
+    feed = ElementTree.fromstring(response.content)
+    return {
+        entry.find(f'{ATOM}title').text
+        for entry in feed.iter(f'{ATOM}entry')
+    }
+
+
+def test_site_feed_lists_published_posts(
+        client, make_post, future_posts, posts_with_unpublished_category
+):
+    post = make_post()
+    hidden = make_post(is_published=False)
+    titles = _titles(client.get('/atom/'))
+    assert post.title in titles
+    assert hidden.title not in titles, (
+        'Убедитесь, что в ленту не попадают снятые с публикации посты.'
+    )
+    assert not titles & {p.title for p in future_posts}, (
+        'Убедитесь, что в ленту не попадают отложенные публикации.'
+    )
+    assert not titles & {
+        p.title for p in posts_with_unpublished_category
+    }
+
+
+def test_category_feed(client, make_post, published_category, mixer):
+    other = mixer.blend('blog.Category', is_published=True)
+    post = make_post()
+    elsewhere = make_post(category=other)
+    titles = _titles(client.get(f'/category/{published_category.slug}/atom/'))
+    assert post.title in titles
+    assert elsewhere.title not in titles
+
+    other.is_published = False
+    other.save()
+    assert client.get(
+        f'/category/{other.slug}/atom/'
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_author_feed_has_no_drafts(user, user_client, make_post):
+    post = make_post()
+    draft = make_post(is_published=False)
+    titles = _titles(user_client.get(f'/profile/{user.username}/atom/'))
+    assert post.title in titles
+    assert draft.title not in titles, (
+        'Убедитесь, что черновики автора не попадают в его ленту.'
+    )
+    assert user_client.get(
+        '/profile/nobody/atom/'
+    ).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_feed_is_cached_until_a_post_changes(client, make_post):
+    post = make_post()
+    client.get('/atom/')
+    response = client.get('/atom/')
+    assert response['X-Page-Cache'] == 'hit', (
+        'Убедитесь, что лента хранится в кеше.'
+    )
+    post.title = 'Обновлённый заголовок'
+    post.save()
+    assert post.title in _titles(client.get('/atom/'))
+
+
+def test_feed_conditional_get(client, user_client, make_post):
+    make_post()
+    first = client.get('/atom/')
+    assert 'Cookie' not in first.get('Vary', '')
+    response = user_client.get('/atom/', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что лента поддерживает условные запросы.'
+    )
+    make_post()
+    response = client.get('/atom/', HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == HTTPStatus.OK
+
+
+def test_feed_never_sends_a_cached_body_under_a_new_etag(client, make_post):
+    post = make_post()
+    client.get('/atom/')
+    etag = client.get('/atom/')['ETag']
+    # A write whose invalidation never reached this process's cache.
+    Post.objects.filter(pk=post.pk).update(
+        title='Новый заголовок', updated_at=timezone.now()
+    )
+    response = client.get('/atom/', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.OK
+    assert 'Новый заголовок' in _titles(response), (
+        'Убедитесь, что под новым ETag лента не отдаётся из кеша.'
+    )
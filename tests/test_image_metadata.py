@@ -0,0 +1,67 @@
+import hashlib
+
+import pytest
+from django.core.files.storage import FileSystemStorage
+from django.core.management import call_command
+
+from blog.models import ImageFile, Post
+from fixtures.posts import image_bytes
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _png():
+    return image_bytes((300, 200), format='PNG')
+
+
+@pytest.fixture
+def post_with_png(make_post_with_image):
+    return make_post_with_image(_png(), name='pic.png')
+
+
+def test_metadata_is_stored_on_upload(post_with_png):
+    image_file = ImageFile.objects.get(posts=post_with_png)
+    content = _png()
+    assert image_file.name == post_with_png.image.name
+    assert (image_file.width, image_file.height) == (300, 200)
+    assert image_file.size == len(content)
+    assert image_file.format == 'PNG'
+    assert image_file.hash == hashlib.sha256(content).hexdigest()
+
+
+def test_clearing_the_image_drops_the_metadata(post_with_png):
+    post_with_png.image = None
+    post_with_png.save()
+    post_with_png.refresh_from_db()
+    assert post_with_png.image_file is None
+
+
+def test_feed_does_not_touch_media(client, post_with_png, monkeypatch):
+    def fail(*args, **kwargs):
+        raise AssertionError(
+            'Убедитесь, что лента берёт размеры фото из базы, '
+            'а не читает файлы.'
+        )
+    client.get('/')
+    monkeypatch.setattr(FileSystemStorage, 'open', fail)
+    monkeypatch.setattr(FileSystemStorage, 'size', fail)
+    response = client.get('/?page=1')
+    assert 'width="300" height="200"' in response.content.decode()
+
+
+def test_backfill_command(post_with_png, capsys):
+    ImageFile.objects.all().delete()
+    call_command('backfill_image_metadata', batch_size=1)
+    image_file = Post.objects.get(pk=post_with_png.pk).image_file
+    assert (image_file.width, image_file.height) == (300, 200)
+    assert image_file.format == 'PNG'
+    assert image_file.hash == hashlib.sha256(_png()).hexdigest()
+    assert 'Обновлено публикаций: 1' in capsys.readouterr().out
+
+
+def test_backfill_reports_missing_files(post_with_png, capsys):
+    Post.objects.filter(pk=post_with_png.pk).update(
+        image='post_images/missing.png', image_file=None
+    )
+    call_command('backfill_image_metadata')
+    assert 'не удалось прочитать файлов: 1' in capsys.readouterr().out
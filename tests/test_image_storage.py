@@ -0,0 +1,73 @@
+import hashlib
+import os
+
+import pytest
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from blog.models import ImageFile, Post
+from blog.storage import post_image_storage
+from fixtures.posts import image_bytes
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _stored_originals():
+    storage = post_image_storage()
+    names = []
+    for root, _, files in os.walk(storage.path('post_images')):
+        names.extend(
+            name for name in files if name.count('.') == 1
+        )
+    return names
+
+
+def test_files_are_named_by_content(make_post_with_image):
+    content = image_bytes()
+    digest = hashlib.sha256(content).hexdigest()
+    post = make_post_with_image(content, name='photo.JPG')
+    assert post.image.name == f'post_images/{digest[:2]}/{digest}.jpg', (
+        'Убедитесь, что загруженные файлы называются по хешу содержимого.'
+    )
+
+
+def test_identical_uploads_share_one_file(make_post_with_image):
+    content = image_bytes()
+    first = make_post_with_image(content, name='a.jpg')
+    second = make_post_with_image(content, name='b.jpg')
+    assert first.image.name == second.image.name
+    assert first.image_file_id == second.image_file_id
+    assert len(_stored_originals()) == 1
+    assert ImageFile.objects.count() == 1
+
+    image_file = ImageFile.objects.get()
+    assert image_file.references == 2
+    first.delete()
+    assert image_file.references == 1
+    assert not ImageFile.objects.unreferenced().exists()
+    second.delete()
+    assert list(ImageFile.objects.unreferenced()) == [image_file]
+
+
+def test_reupload_on_edit_is_not_stored_again(
+        user_client, make_post_with_image, published_category
+):
+    content = image_bytes()
+    post = make_post_with_image(content)
+    response = user_client.post(f'/posts/{post.pk}/edit/', {
+        'title': post.title,
+        'text': 'Новый текст',
+        'pub_date': post.pub_date.strftime('%Y-%m-%d %H:%M'),
+        'category': published_category.pk,
+        'image': SimpleUploadedFile('again.jpeg', content, 'image/jpeg'),
+    })
+    assert response.status_code == 302
+    edited = Post.objects.get(pk=post.pk)
+    assert edited.image.name == post.image.name
+    assert len(_stored_originals()) == 1
+
+
+def test_different_content_gets_a_new_name(make_post_with_image):
+    first = make_post_with_image(image_bytes(color=(0, 0, 0)))
+    second = make_post_with_image(image_bytes(color=(255, 255, 255)))
+    assert first.image.name != second.image.name
+    assert len(_stored_originals()) == 2
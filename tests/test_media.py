@@ -0,0 +1,127 @@
+from http import HTTPStatus
+
+import pytest
+
+from blog.images import generate_renditions, rendition_name
+from fixtures.posts import image_bytes
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def content():
+    return image_bytes(color=(10, 120, 200))
+
+
+@pytest.fixture
+def make_post(make_post_with_image, content):
+    def make(**fields):
+        return make_post_with_image(content, **fields)
+    return make
+
+
+def _body(response):
+    return b''.join(response.streaming_content)
+
+
+def test_published_image_is_public_and_immutable(client, make_post, content):
+    post = make_post()
+    response = client.get(post.image.url)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что фото опубликованного поста отдаётся всем.'
+    )
+    assert _body(response) == content
+    assert response['Content-Type'] == 'image/jpeg'
+    assert response['Content-Length'] == str(len(content))
+    assert response['Cache-Control'] == (
+        'public, max-age=31536000, immutable'
+    ), 'Убедитесь, что файлы с хешем в имени кешируются навсегда.'
+    assert response['ETag']
+
+
+def test_renditions_follow_their_post(client, make_post):
+    post = make_post()
+    generate_renditions(post.image.name)
+    url = post.image.url.replace(
+        post.image.name, rendition_name(post.image.name, 'card', 'webp')
+    )
+    response = client.get(url)
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Type'] == 'image/webp'
+
+
+def test_unpublished_image_is_private(
+        client, user_client, another_user_client, make_post
+):
+    post = make_post(is_published=False)
+    assert client.get(post.image.url).status_code == HTTPStatus.NOT_FOUND, (
+        'Убедитесь, что фото неопубликованного поста не отдаётся анонимам.'
+    )
+    assert another_user_client.get(
+        post.image.url
+    ).status_code == HTTPStatus.NOT_FOUND
+    response = user_client.get(post.image.url)
+    assert response.status_code == HTTPStatus.OK, (
+        'Убедитесь, что автор видит фото своего неопубликованного поста.'
+    )
+    assert response['Cache-Control'].startswith('private')
+    assert 'Cookie' in response['Vary']
+
+
+def test_unknown_files_are_not_served(client, make_post):
+    make_post()
+    for url in ('/media/post_images/missing.jpg', '/media/../manage.py'):
+        assert client.get(url).status_code == HTTPStatus.NOT_FOUND
+
+
+def test_conditional_get(client, make_post):
+    post = make_post()
+    etag = client.get(post.image.url)['ETag']
+    response = client.get(post.image.url, HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED, (
+        'Убедитесь, что при совпадении ETag фото не отправляется заново.'
+    )
+    assert response['ETag'] == etag
+    assert response['Cache-Control'].startswith('public')
+
+
+def test_range_requests(client, make_post, content):
+    post = make_post()
+    response = client.get(post.image.url, HTTP_RANGE='bytes=10-19')
+    assert response.status_code == HTTPStatus.PARTIAL_CONTENT, (
+        'Убедитесь, что поддерживаются запросы с заголовком Range.'
+    )
+    assert _body(response) == content[10:20]
+    assert response['Content-Range'] == f'bytes 10-19/{len(content)}'
+    assert response['Content-Length'] == '10'
+
+    response = client.get(post.image.url, HTTP_RANGE='bytes=-5')
+    assert _body(response) == content[-5:]
+
+    response = client.get(
+        post.image.url, HTTP_RANGE=f'bytes={len(content)}-'
+    )
+    assert response.status_code == HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE
+    assert response['Content-Range'] == f'bytes */{len(content)}'
+
+    response = client.get(
+        post.image.url, HTTP_RANGE='bytes=0-4', HTTP_IF_RANGE='"stale"'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert _body(response) == content
+
+
+@pytest.mark.parametrize('mode, header', [
+    ('x-accel-redirect', 'X-Accel-Redirect'),
+    ('x-sendfile', 'X-Sendfile'),
+])
+def test_offload_to_front_server(client, make_post, settings, mode, header):
+    settings.BLOG_MEDIA_OFFLOAD = mode
+    post = make_post()
+    response = client.get(post.image.url)
+    assert response.status_code == HTTPStatus.OK
+    assert response[header].endswith(post.image.name), (
+        'Убедитесь, что при BLOG_MEDIA_OFFLOAD файл отдаёт фронт-сервер.'
+    )
+    assert response.content == b''
+    assert response['Content-Type'] == 'image/jpeg'
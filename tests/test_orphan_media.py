@@ -0,0 +1,146 @@
+import os
+import time
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+
+from blog.images import generate_renditions, rendition_names, source_stem
+from blog.management.commands.collect_orphan_media import Command
+from blog.models import ImageFile
+from blog.storage import post_image_storage
+from fixtures.posts import image_bytes
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def make_post(make_post_with_image):
+    def make(color):
+        post = make_post_with_image(image_bytes(color=color))
+        generate_renditions(post.image.name)
+        return post
+    return make
+
+
+def _age(name, hours=48):
+    path = post_image_storage().path(name)
+    moment = time.time() - hours * 3600
+    os.utime(path, (moment, moment))
+
+
+def _collect(*args):
+    out = StringIO()
+    call_command('collect_orphan_media', *args, stdout=out)
+    return out.getvalue()
+
+
+@pytest.fixture
+def orphan(make_post):
+    """An old post image whose post is gone, plus its renditions."""
+    post = make_post((0, 0, 0))
+    name = post.image.name
+    post.delete()
+    for stored in [name] + rendition_names(name):
+        _age(stored)
+    return name
+
+
+def test_referenced_files_are_kept(make_post, orphan):
+    kept = make_post((255, 255, 255))
+    for stored in [kept.image.name] + rendition_names(kept.image.name):
+        _age(stored)
+    _collect()
+    storage = post_image_storage()
+    assert storage.exists(kept.image.name), (
+        'Убедитесь, что команда не удаляет фото опубликованных постов.'
+    )
+    assert all(
+        storage.exists(name) for name in rendition_names(kept.image.name)
+    )
+    assert ImageFile.objects.filter(name=kept.image.name).exists()
+
+
+def test_large_batches_are_looked_up_in_chunks(make_post):
+    stem = source_stem(make_post((255, 255, 255)).image.name)
+    stems = [f'post_images/missing{i}' for i in range(1000)] + [stem]
+    assert Command()._referenced_stems(iter(stems)) == {stem}, (
+        'Убедитесь, что команда работает с большими пачками файлов.'
+    )
+
+
+def test_orphans_are_removed_with_renditions(orphan):
+    output = _collect()
+    storage = post_image_storage()
+    assert not storage.exists(orphan), (
+        'Убедитесь, что команда удаляет фото, на которые нет ссылок.'
+    )
+    assert not any(storage.exists(name) for name in rendition_names(orphan))
+    assert not ImageFile.objects.filter(name=orphan).exists()
+    assert '5 файлов' in output
+
+
+def test_fresh_orphans_are_kept(make_post):
+    post = make_post((0, 0, 0))
+    name = post.image.name
+    post.delete()
+    _collect()
+    assert post_image_storage().exists(name), (
+        'Убедитесь, что команда не трогает файлы моложе `--grace-hours`.'
+    )
+    _collect('--grace-hours', '0')
+    assert not post_image_storage().exists(name)
+
+
+def test_dry_run_deletes_nothing(orphan):
+    output = _collect('--dry-run')
+    assert post_image_storage().exists(orphan)
+    assert ImageFile.objects.filter(name=orphan).exists()
+    assert orphan in output
+    assert 'Будет освобождено: 5 файлов' in output
+
+
+def test_quarantine_moves_files(orphan, tmp_path):
+    quarantine = tmp_path / 'quarantine'
+    _collect('--quarantine', str(quarantine))
+    assert not post_image_storage().exists(orphan)
+    assert (quarantine / orphan).is_file(), (
+        'Убедитесь, что с `--quarantine` файлы переносятся, а не удаляются.'
+    )
+
+
+def test_file_reused_during_the_run_is_kept(
+        orphan, mixer, user, published_category, monkeypatch
+):
+    first_look = Command._referenced_stems
+
+    def reuse_after_first_look(self, stems):
+        referenced = first_look(self, stems)
+        monkeypatch.setattr(Command, '_referenced_stems', first_look)
+        # A post with the same bytes reuses the file, as store_image does.
+        mixer.blend(
+            'blog.Post', author=user, category=published_category,
+            image=orphan,
+        )
+        return referenced
+
+    monkeypatch.setattr(Command, '_referenced_stems', reuse_after_first_look)
+    _collect()
+    assert post_image_storage().exists(orphan), (
+        'Убедитесь, что команда перепроверяет ссылки на файлы перед '
+        'удалением.'
+    )
+    assert ImageFile.objects.filter(name=orphan).exists()
+
+
+def test_reupload_restores_a_removed_file(make_post):
+    post = make_post((0, 0, 0))
+    name = post.image.name
+    post.delete()
+    post_image_storage().delete(name)
+    assert ImageFile.objects.filter(name=name).exists()
+    again = make_post((0, 0, 0))
+    assert again.image.name == name
+    assert post_image_storage().exists(name), (
+        'Убедитесь, что повторная загрузка не ссылается на удалённый файл.'
+    )
@@ -0,0 +1,147 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.utils import timezone
+
+from blog import caching
+
+pytestmark = [pytest.mark.django_db]
+
+CACHE_HEADER = 'X-Page-Cache'
+
+
+def test_anonymous_pages_are_cached(
+        client, post_with_published_location, post_of_another_author
+):
+    post = post_with_published_location
+    urls = (
+        '/',
+        f'/posts/{post.id}/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+    )
+    for url in urls:
+        assert client.get(url)[CACHE_HEADER] == 'miss'
+        assert client.get(url)[CACHE_HEADER] == 'hit', (
+            f'Убедитесь, что страница {url} отдаётся анонимам из кеша.'
+        )
+
+    post.title = 'Новый заголовок'
+    post.save()
+    for url in urls:
+        response = client.get(url)
+        assert response[CACHE_HEADER] == 'miss'
+        assert 'Новый заголовок' in response.content.decode()
+
+    other = f'/posts/{post_of_another_author.id}/'
+    client.get(other)
+    post.title = 'Ещё один заголовок'
+    post.save()
+    assert client.get(other)[CACHE_HEADER] == 'hit', (
+        'Убедитесь, что правка публикации сбрасывает только страницы,'
+        ' на которых она показана.'
+    )
+
+
+def test_comment_invalidates_post_pages(
+        client, mixer, post_with_published_location
+):
+    post = post_with_published_location
+    client.get(f'/posts/{post.id}/')
+    client.get('/')
+    mixer.blend('blog.Comment', post=post, text='Свежий комментарий')
+    detail = client.get(f'/posts/{post.id}/')
+    assert 'Свежий комментарий' in detail.content.decode()
+    assert '(1)' in client.get('/').content.decode()
+
+
+def test_logged_in_users_bypass_cache(
+        user_client, post_with_published_location
+):
+    assert CACHE_HEADER not in user_client.get('/')
+
+
+def test_worker_invalidates_feeds(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    client.get('/')
+    with mock.patch(
+        'blog.models.now',
+        return_value=timezone.now() + timedelta(minutes=10),
+    ):
+        call_command('publish_scheduled', once=True)
+        response = client.get('/')
+    assert response[CACHE_HEADER] == 'miss'
+    assert post.title in response.content.decode(), (
+        'Убедитесь, что страница ленты сбрасывается, когда отложенная'
+        ' публикация становится видна.'
+    )
+
+
+def test_post_cards_are_reused_across_pages(
+        user_client, post_with_published_location
+):
+    post = post_with_published_location
+    user_client.get('/')
+    assert caching.card_cache_stats() == {'hits': 0, 'misses': 1}
+    user_client.get(f'/category/{post.category.slug}/')
+    user_client.get(f'/profile/{post.author.username}/')
+    assert caching.card_cache_stats() == {'hits': 2, 'misses': 1}, (
+        'Убедитесь, что карточка публикации берётся из кеша на главной,'
+        ' странице категории и странице профиля.'
+    )
+
+    post.category.title = 'Переименованная категория'
+    post.category.save()
+    assert 'Переименованная категория' in (
+        user_client.get('/').content.decode()
+    )
+    assert caching.card_cache_stats()['misses'] == 2
+
+
+def test_cached_lists_expire_when_scheduled_post_goes_live(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    urls = ('/feed/', f'/category/{published_category.slug}/feed/')
+    for url in urls:
+        client.get(url)
+        assert client.get(url)[CACHE_HEADER] == 'hit'
+    with mock.patch(
+        'blog.models.now',
+        return_value=timezone.now() + timedelta(minutes=10),
+    ):
+        for url in urls:
+            response = client.get(url)
+            assert response[CACHE_HEADER] == 'miss', (
+                'Убедитесь, что закешированная лента устаревает, когда '
+                'наступает время отложенной публикации.'
+            )
+            assert post.title in response.content.decode()
+
+
+def test_publishing_a_category_shows_its_posts(client, mixer, make_post):
+    category = mixer.blend('blog.Category', is_published=False)
+    post = make_post(category=category)
+    client.get('/api/posts/')
+    assert client.get('/api/posts/')[CACHE_HEADER] == 'hit'
+    category.is_published = True
+    category.save()
+    response = client.get('/api/posts/')
+    assert response[CACHE_HEADER] == 'miss'
+    assert post.id in {item['id'] for item in response.json()['results']}, (
+        'Убедитесь, что публикация категории сбрасывает кеш лент.'
+    )
@@ -0,0 +1,96 @@
+import pytest
+from django.test.client import Client
+
+from conftest import N_PER_PAGE
+
+pytestmark = [pytest.mark.django_db]
+
+
+def _expected_ids(posts):
+    return [
+        post.id for post in sorted(
+            posts, key=lambda post: (post.pub_date, post.id), reverse=True
+        )
+    ]
+
+
+def test_cursor_pages_follow_each_other(
+        client: Client, many_posts_with_published_locations
+):
+    expected = _expected_ids(many_posts_with_published_locations)
+    seen, cursor = [], None
+    while True:
+        url = f'/?cursor={cursor}' if cursor else '/'
+        page = client.get(url).context['page_obj']
+        seen.extend(post.id for post in page)
+        if not page.has_next():
+            break
+        cursor = page.next_cursor
+    assert seen == expected, (
+        'Убедитесь, что переход по курсорам «вперёд» проходит ленту целиком,'
+        ' без пропусков и повторов.'
+    )
+
+    previous = client.get(f'/?cursor={page.previous_cursor}')
+    assert [post.id for post in previous.context['page_obj']] == (
+        expected[:N_PER_PAGE]
+    ), 'Убедитесь, что курсор «назад» возвращает предыдущую страницу.'
+
+
+def test_legacy_page_numbers_still_work(
+        client: Client, many_posts_with_published_locations
+):
+    expected = _expected_ids(many_posts_with_published_locations)
+    page = client.get('/?page=2').context['page_obj']
+    assert [post.id for post in page] == expected[N_PER_PAGE:2 * N_PER_PAGE]
+
+
+def test_invalid_cursor_falls_back_to_first_page(
+        client: Client, many_posts_with_published_locations
+):
+    expected = _expected_ids(many_posts_with_published_locations)
+    page = client.get('/?cursor=not-a-cursor').context['page_obj']
+    assert [post.id for post in page] == expected[:N_PER_PAGE]
+    assert not page.has_previous()
+
+
+@pytest.mark.parametrize('feed', ['index', 'category', 'profile'])
+def test_feed_fragments_continue_the_page(
+        feed, client, user, published_category,
+        many_posts_with_published_locations
+):
+    expected = _expected_ids(many_posts_with_published_locations)
+    page_url, fragment_url = {
+        'index': ('/', '/feed/'),
+        'category': (
+            f'/category/{published_category.slug}/',
+            f'/category/{published_category.slug}/feed/',
+        ),
+        'profile': (
+            f'/profile/{user.username}/',
+            f'/profile/{user.username}/feed/',
+        ),
+    }[feed]
+    page = client.get(page_url).context['page_obj']
+    response = client.get(f'{fragment_url}?cursor={page.next_cursor}')
+    content = response.content.decode()
+    assert '<html' not in content and '<header' not in content, (
+        'Убедитесь, что фрагмент ленты не рендерит каркас base.html.'
+    )
+    assert [post.id for post in response.context['page_obj']] == (
+        expected[N_PER_PAGE:2 * N_PER_PAGE]
+    )
+    assert 'X-Next-Cursor' not in response, (
+        'Убедитесь, что у последней порции ленты нет следующего курсора.'
+    )
+
+
+def test_public_fragment_skips_session_lookup(
+        user_client, django_assert_num_queries,
+        many_posts_with_published_locations
+):
+    user_client.get('/feed/')
+    with django_assert_num_queries(0):
+        response = user_client.get('/feed/')
+    assert response['X-Page-Cache'] == 'hit'
+    assert 'X-Next-Cursor' in response
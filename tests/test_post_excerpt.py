@@ -0,0 +1,42 @@
+import pytest
+from django.core.management import call_command
+
+pytestmark = [pytest.mark.django_db]
+
+LONG_TEXT = ' '.join(f'слово{i}' for i in range(50))
+
+
+def test_excerpt_is_computed_on_save(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        text=LONG_TEXT,
+    )
+    assert post.excerpt == ' '.join(LONG_TEXT.split()[:10]) + ' …'
+
+
+def test_feed_does_not_load_full_text(
+        user_client, mixer, user,
+        published_category
+):
+    mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        text=LONG_TEXT,
+    )
+    response = user_client.get('/')
+    post = response.context['page_obj'][0]
+    assert 'text' in post.get_deferred_fields(), (
+        'Убедитесь, что лента не загружает полный текст публикаций.'
+    )
+    assert 'слово9 …' in response.content.decode()
+    assert 'слово10' not in response.content.decode()
+
+
+def test_backfill_command(mixer, user, published_category, PostModel):
+    post = mixer.blend(
+        'blog.Post', author=user, category=published_category,
+        text=LONG_TEXT,
+    )
+    PostModel.objects.filter(pk=post.pk).update(excerpt='')
+    call_command('backfill_excerpts', batch_size=1)
+    post.refresh_from_db()
+    assert post.excerpt.startswith('слово0')
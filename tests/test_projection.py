@@ -0,0 +1,72 @@
+import pytest
+from django.db.models import Model
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def forbid_deferred_loading(monkeypatch):
+    def refresh_from_db(self, using=None, fields=None):
+        raise AssertionError(
+            f'Шаблон обратился к неподгруженному полю {fields} модели'
+            f' {type(self).__name__}: добавьте его в only() запроса.'
+        )
+
+    monkeypatch.setattr(Model, 'refresh_from_db', refresh_from_db)
+
+
+def _renditions_recorded(post):
+    """Steady state: the first render of a new image records its copies."""
+    post.image_file.renditions_ready = True
+    post.image_file.save()
+
+
+@pytest.mark.parametrize('as_author', [True, False])
+def test_templates_stay_within_projection(
+        as_author, user_client, another_user_client,
+        post_with_published_location, comment_to_a_post,
+        forbid_deferred_loading
+):
+    post = post_with_published_location
+    client = user_client if as_author else another_user_client
+    for url in (
+        '/',
+        f'/category/{post.category.slug}/',
+        f'/profile/{post.author.username}/',
+        f'/posts/{post.id}/',
+    ):
+        assert client.get(url).status_code == 200
+
+
+def test_feed_skips_unused_columns(user_client, post_with_published_location):
+    post = user_client.get('/').context['page_obj'][0]
+    assert {'text'} <= post.get_deferred_fields()
+    assert {'password', 'email', 'last_login'} <= (
+        post.author.get_deferred_fields()
+    ), 'Убедитесь, что в ленте не загружаются лишние поля автора.'
+    assert 'description' in post.category.get_deferred_fields()
+
+
+def test_post_detail_takes_two_queries(
+        client, django_assert_num_queries, mixer,
+        post_with_published_location
+):
+    post = post_with_published_location
+    _renditions_recorded(post)
+    mixer.cycle(3).blend('blog.Comment', post=post)
+    with django_assert_num_queries(2):
+        response = client.get(f'/posts/{post.id}/')
+    assert response.status_code == 200
+
+
+def test_post_detail_author_sees_hidden_post_in_same_queries(
+        user_client, another_user_client, django_assert_num_queries,
+        post_with_published_location
+):
+    post = post_with_published_location
+    _renditions_recorded(post)
+    post.is_published = False
+    post.save()
+    with django_assert_num_queries(4):  # session, user, post, comments
+        assert user_client.get(f'/posts/{post.id}/').status_code == 200
+    assert another_user_client.get(f'/posts/{post.id}/').status_code == 404
@@ -0,0 +1,106 @@
+from datetime import timedelta
+from unittest import mock
+
+import pytest
+from django.core.management import call_command
+from django.test import override_settings
+from django.utils import timezone
+
+from blog.signals import post_became_visible
+
+pytestmark = [pytest.mark.django_db]
+
+
+@override_settings(BLOG_PUBLISHED_BUCKET_SECONDS=60)
+def test_published_sql_is_stable_within_bucket(PostModel):
+    start = timezone.now().replace(second=0, microsecond=0)
+    with mock.patch('blog.models.now', return_value=start):
+        first = str(PostModel.objects.published().query)
+    with mock.patch(
+        'blog.models.now', return_value=start + timedelta(seconds=59)
+    ):
+        second = str(PostModel.objects.published().query)
+    with mock.patch(
+        'blog.models.now', return_value=start + timedelta(seconds=60)
+    ):
+        third = str(PostModel.objects.published().query)
+    assert first == second, (
+        'Убедитесь, что в пределах одного интервала запрос не меняется.'
+    )
+    assert first != third
+
+
+def test_scheduled_post_appears_without_restart(
+        client, mixer, user, published_category
+):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    assert post not in client.get('/').context['page_obj']
+    with mock.patch(
+        'blog.models.now',
+        return_value=timezone.now() + timedelta(minutes=10),
+    ):
+        page = client.get('/').context['page_obj']
+    assert post in page, (
+        'Убедитесь, что отложенная публикация появляется на главной'
+        ' странице, когда наступает её время.'
+    )
+
+
+def test_worker_announces_posts_going_live(mixer, user, published_category):
+    post = mixer.blend(
+        'blog.Post',
+        author=user,
+        category=published_category,
+        pub_date=timezone.now() + timedelta(minutes=5),
+    )
+    received = []
+
+    def receiver(sender, post_ids, **kwargs):
+        received.extend(post_ids)
+
+    post_became_visible.connect(receiver)
+    try:
+        call_command('publish_scheduled', once=True)
+        assert post.id not in received
+        with mock.patch(
+            'blog.models.now',
+            return_value=timezone.now() + timedelta(minutes=10),
+        ):
+            call_command('publish_scheduled', once=True)
+            call_command('publish_scheduled', once=True)
+    finally:
+        post_became_visible.disconnect(receiver)
+    post.refresh_from_db()
+    assert received.count(post.id) == 1, (
+        'Убедитесь, что воркер один раз сообщает о наступившей публикации.'
+    )
+    assert post.visible_since is not None
+
+
+def test_worker_skips_hidden_posts(mixer, user, published_category):
+    hidden_category = mixer.blend('blog.Category', is_published=False)
+    posts = [
+        mixer.blend(
+            'blog.Post',
+            author=user,
+            category=category,
+            is_published=is_published,
+            pub_date=timezone.now() - timedelta(minutes=5),
+            visible_since=None,
+        )
+        for category, is_published in (
+            (published_category, False), (hidden_category, True)
+        )
+    ]
+    call_command('publish_scheduled', once=True)
+    for post in posts:
+        post.refresh_from_db()
+        assert post.visible_since is None, (
+            'Убедитесь, что воркер отмечает только посты, которые видны '
+            'в published().'
+        )
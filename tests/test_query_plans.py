@@ -0,0 +1,62 @@
+import re
+
+import pytest
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='EXPLAIN QUERY PLAN is SQLite'
+    ),
+]
+
+FULL_SCAN = re.compile(r'\bSCAN (blog_post|blog_comment)\b(?! USING)')
+TEMP_SORT = re.compile(r'USE TEMP B-TREE')
+
+
+def _main_queries(client, url):
+    with CaptureQueriesContext(connection) as ctx:
+        response = client.get(url)
+    assert response.status_code == 200
+    return [
+        query['sql'] for query in ctx.captured_queries
+        if query['sql'].startswith('SELECT')
+        and re.search(r'FROM "blog_(post|comment)"', query['sql'])
+    ]
+
+
+def _plan(sql):
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+        return [row[-1] for row in cursor.fetchall()]
+
+
+@pytest.mark.parametrize('url_name', [
+    'index', 'category', 'own_profile', 'other_profile', 'detail'
+])
+def test_feed_queries_use_indexes(
+        url_name, user, user_client, another_user_client,
+        post_with_published_location, comment_to_a_post
+):
+    post = post_with_published_location
+    client, url = {
+        'index': (user_client, '/'),
+        'category': (user_client, f'/category/{post.category.slug}/'),
+        'own_profile': (user_client, f'/profile/{user.username}/'),
+        'other_profile': (
+            another_user_client, f'/profile/{user.username}/'
+        ),
+        'detail': (another_user_client, f'/posts/{post.id}/'),
+    }[url_name]
+    queries = _main_queries(client, url)
+    assert queries
+    for sql in queries:
+        plan = '\n'.join(_plan(sql))
+        assert not FULL_SCAN.search(plan), (
+            f'Запрос страницы {url} читает таблицу целиком:\n{sql}\n{plan}'
+        )
+        assert not TEMP_SORT.search(plan), (
+            f'Запрос страницы {url} сортирует во временном B-дереве:'
+            f'\n{sql}\n{plan}'
+        )
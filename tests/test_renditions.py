@@ -0,0 +1,112 @@
+from concurrent.futures import Future
+
+import pytest
+from bs4 import BeautifulSoup
+from django.core.files.storage import default_storage
+from PIL import Image
+
+from blog import images
+from blog.models import ImageFile
+from blog.storage import post_image_storage
+from fixtures.posts import image_bytes
+
+pytestmark = [pytest.mark.django_db]
+
+
+@pytest.fixture
+def post_with_image(make_post_with_image, django_capture_on_commit_callbacks):
+    with django_capture_on_commit_callbacks(execute=True):
+        return make_post_with_image(image_bytes((2000, 1000)))
+
+
+def _card_picture(client):
+    soup = BeautifulSoup(client.get('/').content.decode(), 'html.parser')
+    return soup.find('picture')
+
+
+def test_renditions_are_generated_on_upload(post_with_image):
+    name = post_with_image.image.name
+    for kind, width in (('card', 640), ('detail', 1280)):
+        for extension in ('jpg', 'webp'):
+            rendition = images.rendition_name(name, kind, extension)
+            assert default_storage.exists(rendition), (
+                f'Убедитесь, что для загруженного изображения создаётся '
+                f'уменьшенная копия {rendition}.'
+            )
+            with default_storage.open(rendition) as file:
+                assert Image.open(file).size == (width, width // 2)
+
+
+def test_card_uses_responsive_picture(client, post_with_image):
+    picture = _card_picture(client)
+    assert picture is not None
+    assert len(picture.find_all('img')) == 1
+    img = picture.img
+    assert img['loading'] == 'lazy'
+    assert (img['width'], img['height']) == ('640', '320')
+    assert img['src'].endswith('.card.jpg')
+    assert '1280w' in img['srcset']
+    assert picture.source['type'] == 'image/webp'
+    assert '.card.webp 640w' in picture.source['srcset']
+
+
+def test_ready_flag_spares_storage_lookups(
+        client, post_with_image, monkeypatch
+):
+    post_with_image.image_file.refresh_from_db()
+    assert post_with_image.image_file.renditions_ready, (
+        'Убедитесь, что готовность копий отмечается в ImageFile.'
+    )
+    monkeypatch.setattr(
+        type(post_image_storage()), 'exists',
+        lambda storage, name: pytest.fail(f'exists({name})')
+    )
+    assert _card_picture(client).img['src'].endswith('.card.jpg')
+
+
+def _unready(post):
+    ImageFile.objects.filter(pk=post.image_file_id).update(
+        renditions_ready=False
+    )
+
+
+def test_missing_renditions_are_regenerated(client, post_with_image):
+    name = post_with_image.image.name
+    for rendition in images.rendition_names(name):
+        default_storage.delete(rendition)
+    _unready(post_with_image)
+    assert _card_picture(client).img['src'].endswith('.card.jpg')
+    assert all(
+        default_storage.exists(rendition)
+        for rendition in images.rendition_names(name)
+    )
+    assert ImageFile.objects.get(name=name).renditions_ready
+
+
+class RecordingExecutor:
+    def __init__(self):
+        self.submitted = []
+
+    def submit(self, function, *args):
+        self.submitted.append(args)
+        return Future()
+
+
+def test_original_is_served_while_pool_works(
+        client, post_with_image, settings, monkeypatch
+):
+    settings.BLOG_RENDITION_WORKERS = 1
+    executor = RecordingExecutor()
+    monkeypatch.setattr(images, '_executor', executor)
+    monkeypatch.setattr(images, '_pending', set())
+    name = post_with_image.image.name
+    default_storage.delete(images.rendition_name(name, 'card', 'webp'))
+    _unready(post_with_image)
+
+    img = _card_picture(client).img
+    assert img['src'] == post_with_image.image.url
+    assert 'srcset' not in img.attrs
+    client.get('/?page=1')
+    assert executor.submitted == [(name,)], (
+        'Убедитесь, что недостающие копии ставятся в очередь один раз.'
+    )
@@ -0,0 +1,90 @@
+from datetime import timedelta
+
+import pytest
+from django.core.management import call_command
+from django.db import connection
+from django.utils import timezone
+
+pytestmark = [
+    pytest.mark.django_db,
+    pytest.mark.skipif(
+        connection.vendor != 'sqlite', reason='FTS5 index is SQLite only'
+    ),
+]
+
+
+def _found(client, query):
+    response = client.get('/search/', {'q': query})
+    assert response.status_code == 200
+    return [post.id for post in response.context['page_obj']]
+
+
+def test_index_follows_saves_and_deletes(client, make_post):
+    post = make_post(title='Прогулка', text='Весенний лес шумит')
+    assert _found(client, 'лес') == [post.id]
+
+    post.text = 'Зимнее море'
+    post.save()
+    assert _found(client, 'лес') == [], (
+        'Убедитесь, что индекс обновляется при изменении публикации.'
+    )
+    assert _found(client, 'море') == [post.id]
+
+    post.delete()
+    assert _found(client, 'море') == []
+
+
+def test_search_respects_visibility(
+        client, make_post, future_posts, posts_with_unpublished_category
+):
+    visible = make_post(text='закат над рекой')
+    make_post(text='закат в горах', is_published=False)
+    make_post(
+        text='закат завтра',
+        pub_date=timezone.now() + timedelta(days=1)
+    )
+    assert _found(client, 'закат') == [visible.id], (
+        'Убедитесь, что поиск показывает только опубликованные посты.'
+    )
+
+
+def test_results_are_ranked_and_highlighted(client, make_post):
+    weak = make_post(title='Заметки', text='кот ' + 'слово ' * 100)
+    strong = make_post(title='Кот', text='кот кот кот')
+    assert _found(client, 'кот') == [strong.id, weak.id]
+    content = client.get('/search/', {'q': 'кот'}).content.decode()
+    assert '<mark>кот</mark>' in content
+
+
+def test_snippet_and_query_are_escaped(client, make_post):
+    make_post(text='<script>alert(1)</script> тревога')
+    response = client.get('/search/', {'q': '"тревога*) -'})
+    content = response.content.decode()
+    assert response.status_code == 200
+    assert '<script>alert' not in content
+    assert '<mark>тревога</mark>' in content
+
+
+def test_location_rename_reindexes_posts(
+        client, make_post, published_location
+):
+    post = make_post(location=published_location, text='текст')
+    published_location.name = 'Архангельск'
+    published_location.save()
+    assert _found(client, 'архангельск') == [post.id]
+
+
+def test_rebuild_command(client, make_post):
+    post = make_post(text='восстановление индекса')
+    with connection.cursor() as cursor:
+        cursor.execute('DELETE FROM blog_post_fts')
+    assert _found(client, 'восстановление') == []
+    call_command('rebuild_search_index', batch_size=1)
+    assert _found(client, 'восстановление') == [post.id]
+
+
+def test_admin_search_uses_index(admin_client, make_post):
+    post = make_post(title='Редкое', text='уникальное содержимое')
+    make_post(title='Другое', text='обычный текст')
+    response = admin_client.get('/admin/blog/post/', {'q': 'уникальн'})
+    assert list(response.context['cl'].result_list) == [post]
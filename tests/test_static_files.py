@@ -0,0 +1,99 @@
+import gzip
+from http import HTTPStatus
+
+import pytest
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import RequestFactory
+
+from blog.middleware import StaticFilesMiddleware, accepted_encodings
+
+
+@pytest.fixture
+def collected(settings, tmp_path):
+    settings.STATIC_ROOT = tmp_path / 'static'
+    call_command('collectstatic', interactive=False, verbosity=0)
+    return settings.STATIC_ROOT
+
+
+@pytest.fixture
+def middleware(collected):
+    return StaticFilesMiddleware(lambda request: HttpResponse(status=404))
+
+
+def _get(middleware, path, **headers):
+    return middleware(RequestFactory().get(path, **headers))
+
+
+def test_collectstatic_builds_hashed_compressed_files(collected):
+    hashed = staticfiles_storage.stored_name('js/comments.js')
+    assert hashed != 'js/comments.js', (
+        'Убедитесь, что собранная статика получает хеш в имени файла.'
+    )
+    original = (collected / hashed).read_bytes()
+    assert gzip.decompress(
+        (collected / f'{hashed}.gz').read_bytes()
+    ) == original, 'Убедитесь, что collectstatic создаёт .gz-версии файлов.'
+
+
+def test_missing_manifest_entries_keep_their_name(collected):
+    assert staticfiles_storage.url('img/missing.png') == (
+        '/static/img/missing.png'
+    )
+
+
+def test_precompressed_variant_is_served(middleware):
+    hashed = staticfiles_storage.stored_name('js/comments.js')
+    response = _get(
+        middleware, f'/static/{hashed}', HTTP_ACCEPT_ENCODING='gzip, br;q=0'
+    )
+    assert response.status_code == HTTPStatus.OK
+    assert response['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response['Vary']
+    assert response['Cache-Control'] == (
+        'public, max-age=31536000, immutable'
+    ), 'Убедитесь, что файлы с хешем в имени кешируются навсегда.'
+    assert response['Content-Type'].endswith('javascript')
+    body = gzip.decompress(b''.join(response.streaming_content))
+    assert body == staticfiles_storage.open(hashed).read()
+
+    plain = _get(middleware, f'/static/{hashed}')
+    assert not plain.has_header('Content-Encoding')
+    assert plain['ETag'] != response['ETag']
+
+
+def test_unhashed_names_are_cached_briefly(middleware):
+    response = _get(middleware, '/static/js/comments.js')
+    assert response.status_code == HTTPStatus.OK
+    assert 'immutable' not in response['Cache-Control']
+
+
+def test_conditional_get(middleware):
+    hashed = staticfiles_storage.stored_name('js/comments.js')
+    etag = _get(middleware, f'/static/{hashed}')['ETag']
+    response = _get(middleware, f'/static/{hashed}', HTTP_IF_NONE_MATCH=etag)
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_unknown_files_pass_through(middleware):
+    assert _get(middleware, '/static/missing.js').status_code == 404
+    assert _get(middleware, '/static/../manage.py').status_code == 404
+
+
+def test_variants_are_not_served_by_name(middleware):
+    hashed = staticfiles_storage.stored_name('js/comments.js')
+    assert _get(middleware, f'/static/{hashed}.gz').status_code == 404, (
+        'Убедитесь, что сжатые копии не отдаются по собственному имени.'
+    )
+
+
+@pytest.mark.parametrize('header, expected', [
+    ('gzip, deflate, br', {'gzip', 'deflate', 'br'}),
+    ('br;q=0, gzip;q=0.5', {'gzip'}),
+    ('GZIP ; q=1.0', {'gzip'}),
+    ('*', {'*', 'br', 'gzip'}),
+    ('', set()),
+])
+def test_accepted_encodings(header, expected):
+    assert accepted_encodings(header) == expected